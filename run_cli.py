@@ -6,23 +6,22 @@ This is the CLI entry point. Core functionality lives in src/pipeline/.
 
 import argparse
 import asyncio
+import json
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from src.shared.logging.logger import get_logger, setup_logging
-from src.shared.config.config_loader import load_env, get_config
-from src.shared.io.run_dir import require_db_path
-from src.pipeline.extraction.workspace_discovery import (
-    list_all_workspaces,
-    list_workspaces_by_page,
-    find_workspace,
-)
-from src.pipeline.extraction.orchestrator import extract_workspaces
-from src.__version__ import __version__
-
-# Initialize logging at module level
-setup_logging()
+from src.shared.config.arg_parser import FastArgumentParser
+from src.shared.logging.logger import get_logger
+
+try:
+    from src.__version__ import __version__
+except ImportError:
+    __version__ = "unknown"
+
+# Heavy pipeline modules (extraction, search, DB) are imported inside the
+# handlers that need them so --help/--version stay fast. The logger itself is
+# cheap; setup_logging() (which reads config) is deferred to main().
 logger = get_logger("run_cli")
 
 EXAMPLES = """\
@@ -50,7 +49,7 @@ def _require_run_dir(args: argparse.Namespace, option: str) -> Path:
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """Parse command line arguments."""
-    parser = argparse.ArgumentParser(
+    parser = FastArgumentParser(
         description="Run the full pipeline for workspace(s)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=EXAMPLES,
@@ -71,11 +70,12 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     
     # Main commands
     parser.add_argument(
-        "--list-workspaces", "--list", nargs="*", metavar=("PAGE", "SIZE"),
+        "--list-workspaces", "--list", nargs="*", type=int, metavar=("PAGE", "SIZE"),
         dest="list_workspaces",
         help="List available workspaces (optional: page number and page size)",
     )
     parser.add_argument("--json", action="store_true", help="Output in JSON format (for list/search)")
+    parser.add_argument("--compact", action="store_true", help="Emit compact (unindented) JSON for --search --json")
     
     parser.add_argument(
         "--extract", nargs="*", metavar="WORKSPACE_ID",
@@ -117,8 +117,6 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
 
 def _print_workspaces(workspaces, page: int, total_count: int, page_size: int, as_json: bool = False) -> None:
     """Print workspaces in a formatted table or as JSON."""
-    import json
-    
     if as_json:
         output = {
             "page": page,
@@ -159,9 +157,11 @@ def _print_workspaces(workspaces, page: int, total_count: int, page_size: int, a
 
 def handle_list_workspaces(args: argparse.Namespace) -> None:
     """Handle --list-workspaces command. Exits after printing."""
+    from src.pipeline.extraction.workspace_discovery import list_workspaces_by_page
+
     ws = args.list_workspaces
-    page = int(ws[0]) if ws and ws[0].isdigit() else 1
-    page_size = int(ws[1]) if len(ws) > 1 and ws[1].isdigit() else 50
+    page = ws[0] if ws else 1
+    page_size = ws[1] if len(ws) > 1 else 50
 
     workspaces, total_count = list_workspaces_by_page(page, page_size)
     _print_workspaces(workspaces, page, total_count, page_size, as_json=args.json)
@@ -169,22 +169,24 @@ def handle_list_workspaces(args: argparse.Namespace) -> None:
 
 
 def _format_search_results(results: List[Dict[str, Any]], total_count: int, page: int, page_size: int) -> None:
-    logger.progress(f"\nSearch results (page {page}, showing {len(results)} of {total_count}):")
-    logger.progress("")
+    lines = [f"\nSearch results (page {page}, showing {len(results)} of {total_count}):", ""]
     for idx, row in enumerate(results, start=1 + (page - 1) * page_size):
         role = row.get("role") or "unknown"
         score = row.get("score", 0.0)
         text = (row.get("original_text") or "").replace("\n", " ").strip()
         snippet = text[:160] + ("..." if len(text) > 160 else "")
-        logger.progress(f"{idx:>4}. [{role}] score={score:.3f} turn={row.get('turn')} session={row.get('session_id')}")
-        logger.progress(f"      {snippet}")
-    logger.progress("")
+        lines.append(f"{idx:>4}. [{role}] score={score:.3f} turn={row.get('turn')} session={row.get('session_id')}")
+        lines.append(f"      {snippet}")
+    lines.append("")
+    # One emit for the whole page instead of two logger calls per row
+    logger.progress("\n".join(lines))
 
 
 async def handle_search(args: argparse.Namespace) -> None:
     """Handle search command."""
     from src.shared.database import db_schema
     from src.shared.database import db_search
+    from src.shared.io.run_dir import require_db_path
 
     run_path = _require_run_dir(args, "--search")
     db_path = require_db_path(run_path)
@@ -219,9 +221,10 @@ async def handle_search(args: argparse.Namespace) -> None:
         conn.close()
 
     if args.json:
-        import json as json_module
-
-        print(json_module.dumps(result, indent=2))
+        if args.compact:
+            print(json.dumps(result, separators=(",", ":")))
+        else:
+            print(json.dumps(result, indent=2))
         return
 
     _format_search_results(
@@ -237,6 +240,7 @@ async def handle_reindex(args: argparse.Namespace) -> None:
     from src.shared.database import db_schema
     from src.shared.search.search_indexer import generate_embeddings
     from src.shared.config.config_loader import get_config
+    from src.shared.io.run_dir import require_db_path
     
     run_path = _require_run_dir(args, "--reindex")
     db_path = require_db_path(run_path)
@@ -260,9 +264,7 @@ async def handle_reindex(args: argparse.Namespace) -> None:
         conn.close()
 
     if args.json:
-        import json as json_module
-
-        print(json_module.dumps({"model": model_name, **stats}, indent=2))
+        print(json.dumps({"model": model_name, **stats}, indent=2))
         return
 
     logger.progress(f"\nSearch index rebuilt using model '{model_name}'")
@@ -270,6 +272,12 @@ async def handle_reindex(args: argparse.Namespace) -> None:
 
 async def handle_extract(args: argparse.Namespace) -> None:
     """Handle workspace extraction."""
+    from src.pipeline.extraction.orchestrator import extract_workspaces
+    from src.pipeline.extraction.workspace_discovery import (
+        list_all_workspaces,
+        find_workspaces,
+    )
+
     # Validate --run-dir is provided
     if not args.run_dir:
         logger.error("[ERROR] --extract requires --run-dir <run_folder>")
@@ -287,7 +295,11 @@ async def handle_extract(args: argparse.Namespace) -> None:
         logger.progress(f"[INFO] Extracting all {len(workspace_ids)} workspaces from storage")
     elif args.extract:
         workspace_ids = args.extract
-        workspaces_info = [ws for ws_id in workspace_ids if (ws := find_workspace(ws_id))]
+        found = find_workspaces(workspace_ids)
+        workspaces_info = [ws for ws in found.values() if ws]
+        missing = [ws_id for ws_id, ws in found.items() if ws is None]
+        if missing:
+            logger.warning(f"[WARN] Workspace(s) not found: {', '.join(missing)}")
     else:
         logger.error("[ERROR] --extract requires workspace IDs or --all")
         logger.progress("[TIP] Use --list to see available workspaces")
@@ -314,6 +326,11 @@ async def handle_extract(args: argparse.Namespace) -> None:
 async def main(argv: Optional[List[str]] = None) -> None:
     """Main CLI entry point."""
     args = parse_args(argv)
+
+    from src.shared.logging.logger import setup_logging
+    from src.shared.config.config_loader import load_env, get_config
+
+    setup_logging()
     
     # Load .env file at startup
     load_env()
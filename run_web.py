@@ -10,8 +10,8 @@ Examples:
     python run_web.py --host 0.0.0.0 --port 8000
 """
 
-import argparse
 from src.__version__ import __version__
+from src.shared.config.arg_parser import FastArgumentParser
 
 
 def main():
@@ -23,7 +23,7 @@ def main():
     except Exception:
         default_port = 8000
     
-    parser = argparse.ArgumentParser(description="Run the pipeline web interface")
+    parser = FastArgumentParser(description="Run the pipeline web interface")
     parser.add_argument(
         "--version", "-v", action="version",
         version=f"gennie-x {__version__}",
@@ -1,8 +1,13 @@
 """Auto-discovery registry for agent extractors via convention-over-configuration."""
 
+import functools
+import importlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Type, Optional, List, TypedDict
+from types import ModuleType
+from typing import Dict, Type, Optional, List, Set, TypedDict
 
 from src.shared.logging.logger import get_logger
 from src.extract_plugins.agent_extractor import AgentExtractor
@@ -23,28 +28,52 @@ _AGENT_REGISTRY: Dict[str, Type[AgentExtractor]] = {}
 _AGENT_METADATA: Dict[str, AgentMetadata] = {}
 
 
+def _import_agent_module(agent_name: str) -> ModuleType:
+    """Import the agent.py module of one plugin package."""
+    return importlib.import_module(f".{agent_name}.agent", package=__package__)
+
+
 def _discover_agents() -> None:
-    """Auto-discover and register agent modules from extract_plugins subdirectories."""
-    import importlib
+    """Auto-discover and register agent modules from extract_plugins subdirectories.
     
+    Plugin modules are imported concurrently (each pulls in its own extractor
+    stack); registration happens afterwards on the calling thread, in
+    directory order.
+    """
     agents_dir = Path(__file__).parent
     
-    for agent_dir in agents_dir.iterdir():
-        # Skip non-directories, private dirs, and folders starting with "_"
-        if not agent_dir.is_dir():
-            continue
-        if agent_dir.name.startswith("_"):
-            continue
+    # One scandir per level: DirEntry caches is_dir(), and the child listing
+    # answers "has agent.py / metadata.json" without extra stat calls.
+    candidates: List[str] = []
+    has_metadata: Set[str] = set()
+    with os.scandir(agents_dir) as entries:
+        for entry in entries:
+            # Skip non-directories, private dirs, and folders starting with "_"
+            if not entry.is_dir():
+                continue
+            if entry.name.startswith("_"):
+                continue
+            
+            with os.scandir(entry.path) as children:
+                child_names = {child.name for child in children}
+            
+            # Check if this directory has a agent.py file
+            if "agent.py" not in child_names:
+                continue
             
-        # Check if this directory has a agent.py file
-        agent_impl_file = agent_dir / "agent.py"
-        if not agent_impl_file.exists():
-            continue
-        
-        agent_name = agent_dir.name
-        
+            candidates.append(entry.name)
+            if "metadata.json" in child_names:
+                has_metadata.add(entry.name)
+    
+    if not candidates:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as executor:
+        futures = {name: executor.submit(_import_agent_module, name) for name in candidates}
+    
+    for agent_name in candidates:
         try:
-            module = importlib.import_module(f".{agent_name}.agent", package=__package__)
+            module = futures[agent_name].result()
             
             class_name = f"{agent_name.title()}Extractor"
             
@@ -60,10 +89,9 @@ def _discover_agents() -> None:
             _AGENT_REGISTRY[agent_name] = extractor_class
             
             # Load metadata if available
-            metadata_file = agent_dir / "metadata.json"
-            if metadata_file.exists():
+            if agent_name in has_metadata:
                 try:
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
+                    with open(agents_dir / agent_name / "metadata.json", 'r', encoding='utf-8') as f:
                         _AGENT_METADATA[agent_name] = json.load(f)
                 except Exception as e:
                     logger.warning(f"Could not load metadata for {agent_name}: {e}")
@@ -98,14 +126,21 @@ def get_all_agent_metadata() -> Dict[str, AgentMetadata]:
     return dict(_AGENT_METADATA)
 
 
+@functools.lru_cache(maxsize=64)
 def get_agent_icon_path(agent: str) -> Optional[Path]:
-    """Get the path to an agent's icon file if it exists."""
+    """Get the path to an agent's icon file if it exists.
+    
+    Results are cached; the cache is cleared whenever agents are (re)discovered.
+    """
     _ensure_agents_loaded()
     
     agents_dir = Path(__file__).parent
     agent_dir = agents_dir / agent
     
-    if not agent_dir.is_dir():
+    try:
+        with os.scandir(agent_dir) as entries:
+            child_names = {entry.name for entry in entries}
+    except OSError:
         return None
     
     metadata = _AGENT_METADATA.get(agent)
@@ -116,9 +151,8 @@ def get_agent_icon_path(agent: str) -> Optional[Path]:
     
     # Fallback: check for common icon filenames
     for icon_name in ['icon.svg', 'icon.png', 'logo.svg', 'logo.png']:
-        icon_path = agent_dir / icon_name
-        if icon_path.exists():
-            return icon_path
+        if icon_name in child_names:
+            return agent_dir / icon_name
     
     return None
 
@@ -133,4 +167,5 @@ def _ensure_agents_loaded() -> None:
     if not _agents_loaded:
         _discover_agents()
         _agents_loaded = True
+        get_agent_icon_path.cache_clear()
 
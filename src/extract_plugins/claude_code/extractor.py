@@ -2,21 +2,74 @@
 """Claude Code Data Extractor."""
 from __future__ import annotations
 
+import calendar
 import json
 import logging
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from src.shared.models.turn import Turn, CodeEdit
 from src.shared.models.workspace import WorkspaceInfo, WorkspaceActivity, ExtractedWorkspace
+from src.shared.io.json_loads import loads as _json_loads
 from src.shared.io.paths import normalize_path
 from ..agent_extractor import AgentExtractor
 
 logger = logging.getLogger(__name__)
 
+_PROJECT_PATH_TABLE = str.maketrans({':': '-', '/': '-', '\\': '-', '.': '-'})
+_CTRL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_CAVEAT_RE = re.compile(
+    r'^Caveat: The messages below were generated by the user while running local commands\. '
+    r'DO NOT respond to these messages or otherwise consider them in your response unless '
+    r'the user explicitly asks you to\.\s*',
+    re.MULTILINE,
+)
+_LOCAL_CMD_STDOUT_RE = re.compile(r'<local-command-stdout>.*?</local-command-stdout>\s*', re.DOTALL)
+_SUBAGENT_PROMPT_RE = re.compile(r'the prompt "([^"]+)"')
+_COMMAND_WORDS = frozenset({'warmup', 'usage', 'help', 'init', 'login', 'status'})
+
+_EXTENSION_LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescriptreact',
+    '.jsx': 'javascriptreact',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.md': 'markdown',
+    '.html': 'html',
+    '.css': 'css',
+    '.scss': 'scss',
+    '.sql': 'sql',
+    '.sh': 'shellscript',
+    '.bash': 'shellscript',
+    '.rs': 'rust',
+    '.go': 'go',
+    '.java': 'java',
+    '.c': 'c',
+    '.cpp': 'cpp',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.cs': 'csharp',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.r': 'r',
+    '.xml': 'xml',
+    '.toml': 'toml',
+    '.ini': 'ini',
+    '.cfg': 'ini',
+    '.env': 'dotenv',
+    '.gitignore': 'ignore',
+}
+
 # Default Claude directory
 def get_claude_dir() -> Path:
     return Path.home() / ".claude"
@@ -31,7 +84,161 @@ def encode_project_path(project_path: str) -> str:
     """Reimplements the logic: projectPath.replace(/[:/\\.]/g, "-")"""
     if not project_path:
         return ""
-    return re.sub(r'[:/\\.]', '-', project_path)
+    return project_path.translate(_PROJECT_PATH_TABLE)
+
+# Cache of history.jsonl lookups: path -> ((mtime_ns, size), {encoded_id: project_path})
+_history_map_cache: dict[Path, tuple[tuple[int, int], dict[str, str]]] = {}
+
+
+def clear_history_map_cache() -> None:
+    """Clear the history.jsonl cache. Call when history may have changed in place."""
+    _history_map_cache.clear()
+
+
+def load_history_map(history_file: Path) -> dict[str, str]:
+    """Map encoded workspace IDs to project paths from history.jsonl.
+
+    The parsed map is cached until the file's mtime or size changes, so
+    scanning and extracting many workspaces reads the history once. The first
+    project path seen for an encoded ID wins.
+    """
+    try:
+        st = history_file.stat()
+    except OSError:
+        return {}
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _history_map_cache.get(history_file)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    history_map: dict[str, str] = {}
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = _json_loads(line)
+                    p_path = entry.get('project')
+                    if p_path:
+                        history_map.setdefault(encode_project_path(p_path), p_path)
+                except (json.JSONDecodeError, KeyError):
+                    continue
+    except Exception as e:
+        logger.error(f"Error reading history.jsonl: {e}")
+        return history_map
+
+    _history_map_cache[history_file] = (signature, history_map)
+    return history_map
+
+def _iso_to_ms(ts_iso: str) -> int:
+    """Convert an ISO timestamp to epoch milliseconds, or 0 if it cannot be parsed.
+
+    Claude Code writes UTC timestamps as YYYY-MM-DDTHH:MM:SS.sssZ; those are
+    sliced directly instead of going through datetime. Anything else takes
+    the datetime.fromisoformat path. Both round the same way.
+    """
+    if (len(ts_iso) in (20, 24) and ts_iso[-1] == 'Z' and ts_iso[4] == '-' and ts_iso[7] == '-'
+            and ts_iso[10] == 'T' and ts_iso[13] == ':' and ts_iso[16] == ':'
+            and (len(ts_iso) == 20 or ts_iso[19] == '.')):
+        try:
+            year, month, day = int(ts_iso[0:4]), int(ts_iso[5:7]), int(ts_iso[8:10])
+            hour, minute, second = int(ts_iso[11:13]), int(ts_iso[14:16]), int(ts_iso[17:19])
+            micros = int(ts_iso[20:23]) * 1000 if len(ts_iso) == 24 else 0
+        except ValueError:
+            year = 0
+        # Days past 28 are left to datetime, which rejects e.g. Feb 30
+        if year and 1 <= month <= 12 and 1 <= day <= 28 and hour < 24 and minute < 60 and second < 60:
+            seconds = calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0))
+            # Same float arithmetic as int(datetime.timestamp() * 1000)
+            return int((seconds * 1_000_000 + micros) / 1_000_000 * 1000)
+    try:
+        dt = datetime.fromisoformat(ts_iso.replace('Z', '+00:00'))
+        return int(dt.timestamp() * 1000)
+    except ValueError:
+        return 0
+
+def _is_command_message(text: str, raw_content, is_meta: bool) -> bool:
+    """Check if a message is a command that should be filtered entirely."""
+    if not text and not raw_content:
+        return False
+    raw_str = str(raw_content)
+    
+    # Messages with <command-name> tag are always commands
+    if '<command-name>' in raw_str:
+        return True
+    
+    # "Create a Task with subagent_type" is a command-generated message (triggers subagent)
+    if 'Create a Task with subagent_type' in text:
+        return True
+        
+    # Single-word commands (warmup, usage, etc.) - common slash commands
+    text_stripped = text.strip().lower()
+    if text_stripped in _COMMAND_WORDS:
+        return True
+    
+    return False
+
+
+def _is_synthetic_or_error_message(msg: dict) -> bool:
+    """Check if message is synthetic (system-generated) or an API error.
+    
+    These messages should be filtered as they're not part of the actual conversation:
+    - isApiErrorMessage=True: API errors like 'Invalid API key'
+    - model='<synthetic>': System-generated messages not from the LLM
+    """
+    if msg.get('isApiErrorMessage'):
+        return True
+    model = msg.get('message', {}).get('model', '')
+    if model == '<synthetic>':
+        return True
+    return False
+
+
+def _is_subagent_trigger(text: str) -> bool:
+    """Check if this message triggers a subagent task."""
+    return 'Create a Task with subagent_type' in text
+
+
+def _extract_subagent_prompt(text: str) -> str:
+    """Extract the prompt from a 'Create a Task with subagent_type' message."""
+    match = _SUBAGENT_PROMPT_RE.search(text)
+    return match.group(1) if match else ""
+
+
+def _clean_user_text(text: str) -> str:
+    """Clean user message text by removing system prefixes, command output, and control chars."""
+    if not text:
+        return text
+    
+    # Remove control characters (backspace \x08, etc.) that may have been captured
+    # from terminal input - these cause DB viewers to display as BLOB
+    # Keep newline (\n), carriage return (\r), and tab (\t)
+    text = _CTRL_CHARS_RE.sub('', text)
+    
+    # Remove the "Caveat:..." prefix if present
+    text = _CAVEAT_RE.sub('', text)
+    
+    # Remove <local-command-stdout>...</local-command-stdout> blocks
+    text = _LOCAL_CMD_STDOUT_RE.sub('', text)
+    
+    return text.strip()
+
+
+def _is_subagent_prompt(text: str, prev_text: str) -> bool:
+    """Check if this message is a prompt passed to a subagent (should be filtered)."""
+    # If previous message was "Create a Task with subagent_type X and the prompt Y"
+    # then this message might be that prompt Y repeated
+    if prev_text and 'Create a Task with subagent_type' in prev_text:
+        # Extract the prompt from previous message
+        match = _SUBAGENT_PROMPT_RE.search(prev_text)
+        if match:
+            prompt = match.group(1)
+            # If current text starts with or equals the prompt, it's a duplicate
+            if text.strip().startswith(prompt[:50]):
+                return True
+    return False
+
 
 @dataclass
 class ClaudeWorkspaceMeta:
@@ -66,21 +273,40 @@ class ClaudeCodeExtractor(AgentExtractor):
         the session was started but no actual conversation occurred.
         """
         try:
-            content = session_file.read_text(encoding='utf-8')
-            for line in content.strip().split('\n'):
-                if not line.strip():
-                    continue
-                try:
-                    msg = json.loads(line)
-                    msg_type = msg.get('type')
-                    if msg_type in ('user', 'assistant'):
-                        return True
-                except json.JSONDecodeError:
-                    continue
+            # Stream raw lines and stop at the first chat message; both parsers accept bytes
+            with open(session_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        msg = _json_loads(line)
+                        msg_type = msg.get('type')
+                        if msg_type in ('user', 'assistant'):
+                            return True
+                    except json.JSONDecodeError:
+                        continue
             return False
         except Exception:
             return False
 
+    def _list_session_entries(self, ws_dir: Path) -> list[os.DirEntry]:
+        """List the *.jsonl session files in a workspace directory ([] if it cannot be read)."""
+        try:
+            with os.scandir(ws_dir) as it:
+                return [entry for entry in it if entry.name.endswith('.jsonl') and entry.is_file()]
+        except OSError:
+            return []
+
+    def _probe_session(self, entry: os.DirEntry) -> tuple[float, bool]:
+        """Return (mtime, has_content) for a session file; (0, False) if it cannot be stat'ed."""
+        try:
+            # DirEntry caches stat results (on Windows they come with the listing)
+            mtime = entry.stat().st_mtime
+        except OSError:
+            return 0, False
+        # Check if session has real content (user/assistant messages)
+        return mtime, self._session_has_content(Path(entry.path))
+
     def scan_workspaces(self) -> List[WorkspaceInfo]:
         """Scan ~/.claude/history.jsonl and projects dir."""
         workspaces = []
@@ -90,71 +316,61 @@ class ClaudeCodeExtractor(AgentExtractor):
         if not history_file.exists():
             return []
 
-        # Read history to find known workspaces
-        known_projects = set()
-        
+        # List the project directories once instead of stat'ing a path per
+        # history entry. normcase keeps lookups case-insensitive on Windows,
+        # like the exists() checks they replace.
         try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    try:
-                        entry = json.loads(line)
-                        p_path = entry.get('project')
-                        if p_path:
-                            known_projects.add(p_path)
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-        except Exception as e:
-            logger.error(f"Error reading history.jsonl: {e}")
+            with os.scandir(projects_dir) as it:
+                existing_dirs = {os.path.normcase(entry.name): entry.name for entry in it if entry.is_dir()}
+        except OSError:
+            existing_dirs = {}
 
-        # Verify existence on disk and create WorkspaceInfo
-        for p_path in known_projects:
-            encoded = encode_project_path(p_path)
-            ws_dir = projects_dir / encoded
-            
-            # Check if directory exists or if we have at least one session file that matches
-            # Actually Claude Code stores files in `projects/encoded_path/` ??
-            # Based on previous analysis: 
-            # ~/.claude/projects/C--code-learn-interview/.jsonl files exist inside?
-            # OR ~/.claude/projects/C--code-learn-interview.jsonl ?
-            
-            # Let's double check the storage logic I found earlier:
-            # "projectsDir = join(claudeDir, "projects")"
-            # "const projectPath = join(projectsDir, dir.name)" -> It is a directory.
-            
-            if ws_dir.exists() and ws_dir.is_dir():
-                # Count sessions that have actual conversation content
-                session_files = list(ws_dir.glob("*.jsonl"))
-                valid_session_count = 0
-                
-                # Get last modified
-                last_modified = 0
-                for sf in session_files:
-                    try:
-                        mtime = sf.stat().st_mtime
-                        if mtime > last_modified:
-                            last_modified = mtime
-                        # Check if session has real content (user/assistant messages)
-                        if self._session_has_content(sf):
-                            valid_session_count += 1
-                    except OSError:
-                        pass
-                
-                # Skip workspaces with no valid sessions
-                if valid_session_count == 0:
-                    logger.debug(f"Skipping workspace {encoded} - no sessions with content")
-                    continue
-                
-                dt = datetime.fromtimestamp(last_modified, tz=timezone.utc) if last_modified > 0 else datetime.now(timezone.utc)
-
-                workspaces.append(WorkspaceInfo(
-                    workspace_id=encoded, # Use encoded path as ID
-                    workspace_name=Path(p_path).name,
-                    workspace_folder=p_path,
-                    agents=[self.AGENT_NAME],
-                    session_count=valid_session_count,
+        # Claude Code stores each project's sessions as *.jsonl files in
+        # projects/<encoded project path>/; collect them per workspace
+        candidates: list[tuple[str, str, list[os.DirEntry]]] = []
+        for encoded, p_path in load_history_map(history_file).items():
+            dir_name = existing_dirs.get(os.path.normcase(encoded))
+            if dir_name is not None:
+                candidates.append((encoded, p_path, self._list_session_entries(projects_dir / dir_name)))
+
+        # Probe every session file concurrently - the checks are independent blocking reads
+        all_session_files = [sf for _, _, session_files in candidates for sf in session_files]
+        probes: dict[str, tuple[float, bool]] = {}
+        if all_session_files:
+            with ThreadPoolExecutor(max_workers=min(32, len(all_session_files))) as executor:
+                probes = dict(zip(
+                    (sf.path for sf in all_session_files),
+                    executor.map(self._probe_session, all_session_files),
                 ))
+
+        # Create WorkspaceInfo for workspaces with at least one real session
+        for encoded, p_path, session_files in candidates:
+            # Count sessions that have actual conversation content
+            valid_session_count = 0
+            
+            # Get last modified
+            last_modified = 0
+            for sf in session_files:
+                mtime, has_content = probes[sf.path]
+                if mtime > last_modified:
+                    last_modified = mtime
+                if has_content:
+                    valid_session_count += 1
+            
+            # Skip workspaces with no valid sessions
+            if valid_session_count == 0:
+                logger.debug(f"Skipping workspace {encoded} - no sessions with content")
+                continue
+            
+            dt = datetime.fromtimestamp(last_modified, tz=timezone.utc) if last_modified > 0 else datetime.now(timezone.utc)
+
+            workspaces.append(WorkspaceInfo(
+                workspace_id=encoded, # Use encoded path as ID
+                workspace_name=Path(p_path).name,
+                workspace_folder=p_path,
+                agents=[self.AGENT_NAME],
+                session_count=valid_session_count,
+            ))
         
         return workspaces
 
@@ -183,78 +399,48 @@ class ClaudeCodeExtractor(AgentExtractor):
                 code_metrics=[],
             )
 
-        # Get original project path from history if possible, or infer?
-        # We can try to decode or just look up in history.
-        # For now, let's look up in history since we have the encoded ID.
-        # But scanning history every time is inefficient. 
-        # We will infer name from ID for now.
-        
-        # We need to find the "Project Path" (e.g. c:/code/...) 
-        # Read from history.jsonl to find the actual folder path for this encoded workspace
-        actual_folder_path = None
-        history_file = self._get_history_file()
-        if history_file.exists():
-            try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if not line.strip():
-                            continue
-                        try:
-                            entry = json.loads(line)
-                            p_path = entry.get('project')
-                            if p_path and encode_project_path(p_path) == encoded_path:
-                                actual_folder_path = p_path
-                                break
-                        except (json.JSONDecodeError, KeyError):
-                            continue
-            except Exception as e:
-                logger.warning(f"Could not read history.jsonl for folder lookup: {e}")
+        # Look up the actual folder path for this encoded workspace in history.jsonl
+        actual_folder_path = load_history_map(self._get_history_file()).get(encoded_path)
         
         # Fallback: if we couldn't find the folder in history, use encoded path
         if not actual_folder_path:
             logger.warning(f"Could not find actual folder path for {encoded_path}, using encoded path")
             actual_folder_path = encoded_path
         
-        session_files = list(ws_dir.glob("*.jsonl"))
+        session_files = [Path(entry.path) for entry in self._list_session_entries(ws_dir)]
         
-        # First pass: load all sessions and extract fingerprints for deduplication
+        # First pass: extract fingerprints for deduplication
         # Claude Code sometimes creates multiple session files where one is a 
         # subset/checkpoint of another. We deduplicate by keeping only the 
         # largest session when one is a complete subset of another.
-        loaded_sessions: dict[str, tuple[list[dict], set[tuple[str, str]]]] = {}
+        # Only fingerprints are kept here; messages are re-read per session in
+        # the second pass and never held as a list.
+        fingerprints: dict[str, set[tuple[str, str]]] = {}
+        session_paths: dict[str, Path] = {}
         
         for sf in session_files:
             session_id = sf.stem
             try:
-                content = sf.read_text(encoding='utf-8')
-                lines = content.strip().split('\n')
-                
-                messages = []
-                for line in lines:
-                    if not line.strip(): continue
-                    try:
-                        messages.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
-                
-                # Extract fingerprint: set of (timestamp, content_preview) for user messages
-                fingerprint = self._extract_session_fingerprint(messages)
-                loaded_sessions[session_id] = (messages, fingerprint)
+                # Extract fingerprint: set of (timestamp, content_preview) for user messages,
+                # consuming messages as they are parsed rather than building a list
+                fingerprints[session_id] = self._extract_session_fingerprint(self._iter_session_messages(sf))
+                session_paths[session_id] = sf
                 
             except Exception as e:
                 logger.error(f"Error loading session {sf}: {e}")
         
         # Deduplicate: identify sessions that are subsets of others
-        sessions_to_skip = self._find_subset_sessions(loaded_sessions)
+        sessions_to_skip = self._find_subset_sessions(fingerprints)
         if sessions_to_skip:
             logger.info(f"Skipping {len(sessions_to_skip)} subset session(s): {sessions_to_skip}")
         
         # Second pass: convert non-duplicate sessions to turns
-        for session_id, (messages, _) in loaded_sessions.items():
+        for session_id, sf in session_paths.items():
             if session_id in sessions_to_skip:
                 continue
             try:
-                # Convert messages to Turns
+                # Convert messages to Turns, streaming them straight from the file
+                messages = self._iter_session_messages(sf)
                 session_turns = self._convert_session(session_id, messages, encoded_path, actual_folder_path)
                 all_turns.extend(session_turns)
                 
@@ -280,7 +466,17 @@ class ClaudeCodeExtractor(AgentExtractor):
             code_metrics=[],
         )
 
-    def _extract_session_fingerprint(self, messages: List[dict]) -> set[tuple[str, str]]:
+    def _iter_session_messages(self, session_file: Path) -> Iterator[dict]:
+        """Yield parsed messages from a session JSONL file, skipping blank and malformed lines."""
+        with open(session_file, 'rb') as f:
+            for line in f:
+                if not line.strip(): continue
+                try:
+                    yield _json_loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _extract_session_fingerprint(self, messages: Iterable[dict]) -> set[tuple[str, str]]:
         """Extract a fingerprint from session messages for deduplication.
         
         Returns a set of (timestamp, content_preview) tuples for user messages.
@@ -310,46 +506,43 @@ class ClaudeCodeExtractor(AgentExtractor):
         
         return fingerprint
     
-    def _find_subset_sessions(
-        self, 
-        loaded_sessions: dict[str, tuple[list[dict], set[tuple[str, str]]]]
-    ) -> set[str]:
+    def _find_subset_sessions(self, fingerprints: dict[str, set[tuple[str, str]]]) -> set[str]:
         """Find sessions that are complete subsets of other sessions.
         
         Returns session IDs that should be skipped (they are subsets of larger sessions).
         """
         sessions_to_skip: set[str] = set()
-        session_ids = list(loaded_sessions.keys())
         
-        for i in range(len(session_ids)):
-            s1_id = session_ids[i]
-            _, fp1 = loaded_sessions[s1_id]
-            
-            # Skip empty sessions
-            if not fp1:
-                sessions_to_skip.add(s1_id)
+        # Encode each fingerprint as an int bitmask over element IDs assigned
+        # in first-seen order; Python ints are unbounded, so the encoding is
+        # exact and "a is a subset of b" becomes a & ~b == 0.
+        element_ids: dict[tuple[str, str], int] = {}
+        sized: list[tuple[str, int, int]] = []
+        for session_id, fp in fingerprints.items():
+            if not fp:
+                # Skip empty sessions
+                sessions_to_skip.add(session_id)
                 continue
-            
-            for j in range(i + 1, len(session_ids)):
-                s2_id = session_ids[j]
-                _, fp2 = loaded_sessions[s2_id]
-                
-                if not fp2:
-                    continue
-                
-                # Check if one is a subset of the other
-                if fp1.issubset(fp2) and fp1 != fp2:
+            mask = 0
+            for element in fp:
+                mask |= 1 << element_ids.setdefault(element, len(element_ids))
+            sized.append((session_id, mask, len(fp)))
+        
+        # A set can only be a strict subset of a strictly larger set, so order
+        # by size and compare each session only against later, larger ones.
+        sized.sort(key=lambda item: item[2])
+        
+        for i, (s1_id, mask1, size1) in enumerate(sized):
+            for s2_id, mask2, size2 in sized[i + 1:]:
+                if size2 > size1 and not mask1 & ~mask2:
                     # s1 is a subset of s2, skip s1
                     sessions_to_skip.add(s1_id)
                     logger.debug(f"Session {s1_id[:8]}... is subset of {s2_id[:8]}...")
-                elif fp2.issubset(fp1) and fp2 != fp1:
-                    # s2 is a subset of s1, skip s2
-                    sessions_to_skip.add(s2_id)
-                    logger.debug(f"Session {s2_id[:8]}... is subset of {s1_id[:8]}...")
+                    break
         
         return sessions_to_skip
 
-    def _convert_session(self, session_id: str, messages: List[dict], workspace_encoded: str, workspace_folder: str) -> List[Turn]:
+    def _convert_session(self, session_id: str, messages: Iterable[dict], workspace_encoded: str, workspace_folder: str) -> List[Turn]:
         """Convert raw Claude Code messages to aggregated turns.
         
         Claude Code stores each tool_use and tool_result as separate messages, which leads to:
@@ -370,83 +563,6 @@ class ClaudeCodeExtractor(AgentExtractor):
         - Removing <local-command-stdout>...</local-command-stdout> blocks
         """
         
-        def is_command_message(text: str, raw_content, is_meta: bool) -> bool:
-            """Check if a message is a command that should be filtered entirely."""
-            if not text and not raw_content:
-                return False
-            raw_str = str(raw_content)
-            
-            # Messages with <command-name> tag are always commands
-            if '<command-name>' in raw_str:
-                return True
-            
-            # "Create a Task with subagent_type" is a command-generated message (triggers subagent)
-            if 'Create a Task with subagent_type' in text:
-                return True
-                
-            # Single-word commands (warmup, usage, etc.) - common slash commands
-            text_stripped = text.strip().lower()
-            if text_stripped in {'warmup', 'usage', 'help', 'init', 'login', 'status'}:
-                return True
-            
-            return False
-        
-        def is_synthetic_or_error_message(msg: dict) -> bool:
-            """Check if message is synthetic (system-generated) or an API error.
-            
-            These messages should be filtered as they're not part of the actual conversation:
-            - isApiErrorMessage=True: API errors like 'Invalid API key'
-            - model='<synthetic>': System-generated messages not from the LLM
-            """
-            if msg.get('isApiErrorMessage'):
-                return True
-            model = msg.get('message', {}).get('model', '')
-            if model == '<synthetic>':
-                return True
-            return False
-        
-        def is_subagent_trigger(text: str) -> bool:
-            """Check if this message triggers a subagent task."""
-            return 'Create a Task with subagent_type' in text
-        
-        def extract_subagent_prompt(text: str) -> str:
-            """Extract the prompt from a 'Create a Task with subagent_type' message."""
-            match = re.search(r'the prompt "([^"]+)"', text)
-            return match.group(1) if match else ""
-        
-        def clean_user_text(text: str) -> str:
-            """Clean user message text by removing system prefixes, command output, and control chars."""
-            if not text:
-                return text
-            
-            # Remove control characters (backspace \x08, etc.) that may have been captured
-            # from terminal input - these cause DB viewers to display as BLOB
-            # Keep newline (\n), carriage return (\r), and tab (\t)
-            text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
-            
-            # Remove the "Caveat:..." prefix if present
-            caveat_pattern = r'^Caveat: The messages below were generated by the user while running local commands\. DO NOT respond to these messages or otherwise consider them in your response unless the user explicitly asks you to\.\s*'
-            text = re.sub(caveat_pattern, '', text, flags=re.MULTILINE)
-            
-            # Remove <local-command-stdout>...</local-command-stdout> blocks
-            text = re.sub(r'<local-command-stdout>.*?</local-command-stdout>\s*', '', text, flags=re.DOTALL)
-            
-            return text.strip()
-        
-        def is_subagent_prompt(text: str, prev_text: str) -> bool:
-            """Check if this message is a prompt passed to a subagent (should be filtered)."""
-            # If previous message was "Create a Task with subagent_type X and the prompt Y"
-            # then this message might be that prompt Y repeated
-            if prev_text and 'Create a Task with subagent_type' in prev_text:
-                # Extract the prompt from previous message
-                match = re.search(r'the prompt "([^"]+)"', prev_text)
-                if match:
-                    prompt = match.group(1)
-                    # If current text starts with or equals the prompt, it's a duplicate
-                    if text.strip().startswith(prompt[:50]):
-                        return True
-            return False
-        
         # First pass: collect and aggregate messages, tracking command context
         aggregated = []
         current = None
@@ -469,13 +585,7 @@ class ClaudeCodeExtractor(AgentExtractor):
             ts_iso = msg.get('timestamp', '')
             
             # Parse timestamp
-            ts_ms = 0
-            if ts_iso:
-                try:
-                    dt = datetime.fromisoformat(ts_iso.replace('Z', '+00:00'))
-                    ts_ms = int(dt.timestamp() * 1000)
-                except ValueError:
-                    pass
+            ts_ms = _iso_to_ms(ts_iso) if ts_iso else 0
             
             # Extract request/model info (available at top level for assistant messages)
             request_id = msg.get('requestId', '')
@@ -483,15 +593,16 @@ class ClaudeCodeExtractor(AgentExtractor):
             
             # Extract content from this message
             text_parts = []
-            tools = []
-            files = []
-            code_edits = []
+            # Plain-string messages (most user turns) carry no tools, files or
+            # edits; share empty tuples and only allocate lists for block content
+            tools = files = code_edits = ()
             thinking = ""
             is_tool_result_only = False
             
             if isinstance(raw_content, str):
                 text_parts.append(raw_content)
             elif isinstance(raw_content, list):
+                tools, files, code_edits = [], [], []
                 has_text = False
                 has_tool_result = False
                 
@@ -530,12 +641,13 @@ class ClaudeCodeExtractor(AgentExtractor):
                             old_str = t_input.get('old_string', '')
                             new_str = t_input.get('new_string', '')
                             lang = self._detect_language(fp)
+                            # No diff string: code_before/code_after already carry the
+                            # edit and nothing downstream reads CodeEdit.diff
                             code_edits.append(CodeEdit(
                                 file_path=fp,
                                 language=lang,
                                 code_before=old_str,
                                 code_after=new_str,
-                                diff=f"--- old\n+++ new\n@@ @@\n-{old_str}\n+{new_str}",
                                 extra={'tool': 'Edit'}
                             ))
                     elif b_type == 'tool_result':
@@ -549,10 +661,10 @@ class ClaudeCodeExtractor(AgentExtractor):
             full_text = "\n".join(text_parts)
             
             # Check if this is a command message that should be filtered entirely
-            if is_command_message(full_text, raw_content, is_meta):
+            if _is_command_message(full_text, raw_content, is_meta):
                 # Check if this triggers a subagent
-                if is_subagent_trigger(full_text):
-                    subagent_prompt = extract_subagent_prompt(full_text)
+                if _is_subagent_trigger(full_text):
+                    subagent_prompt = _extract_subagent_prompt(full_text)
                     in_subagent_context = True
                 prev_was_command = True
                 prev_text = full_text
@@ -570,7 +682,7 @@ class ClaudeCodeExtractor(AgentExtractor):
             # Handle command response filtering for assistant messages
             if m_type == 'assistant':
                 # Skip synthetic/error messages (isApiErrorMessage or model='<synthetic>')
-                if is_synthetic_or_error_message(msg):
+                if _is_synthetic_or_error_message(msg):
                     prev_was_command = False
                     prev_text = full_text
                     continue
@@ -600,7 +712,7 @@ class ClaudeCodeExtractor(AgentExtractor):
             
             # Clean user message text (remove Caveat prefix and local-command-stdout)
             if m_type == 'user':
-                full_text = clean_user_text(full_text)
+                full_text = _clean_user_text(full_text)
                 text_parts = [full_text] if full_text else []
             
             # Skip if no content left after cleaning (but keep thinking-only messages for aggregation)
@@ -614,8 +726,8 @@ class ClaudeCodeExtractor(AgentExtractor):
             if current and current['role'] == m_type:
                 # Same role - aggregate
                 current['text_parts'].extend(text_parts)
-                current['tools'].extend(tools)
-                current['files'].extend(files)
+                current['tools'].update(tools)
+                current['files'].update(files)
                 current['code_edits'].extend(code_edits)
                 current['thinking'] += thinking
                 # Keep the earliest timestamp
@@ -634,9 +746,9 @@ class ClaudeCodeExtractor(AgentExtractor):
                 current = {
                     'role': m_type,
                     'text_parts': text_parts,
-                    'tools': tools,
-                    'files': files,
-                    'code_edits': code_edits,
+                    'tools': set(tools),
+                    'files': set(files),
+                    'code_edits': list(code_edits),
                     'thinking': thinking,
                     'ts_ms': ts_ms,
                     'ts_iso': ts_iso,
@@ -656,8 +768,8 @@ class ClaudeCodeExtractor(AgentExtractor):
         
         for agg in aggregated:
             text = "\n".join(agg['text_parts']).strip()
-            tools = sorted(list(set(agg['tools'])))
-            files = sorted(list(set(agg['files'])))
+            tools = sorted(agg['tools'])
+            files = sorted(agg['files'])
             code_edits = agg.get('code_edits', [])
             thinking = agg['thinking'].strip()
             model_id = agg.get('model_id', '')
@@ -703,44 +815,7 @@ class ClaudeCodeExtractor(AgentExtractor):
 
     def _detect_language(self, file_path: str) -> str:
         """Detect programming language from file extension."""
-        ext_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.tsx': 'typescriptreact',
-            '.jsx': 'javascriptreact',
-            '.json': 'json',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.md': 'markdown',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'scss',
-            '.sql': 'sql',
-            '.sh': 'shellscript',
-            '.bash': 'shellscript',
-            '.rs': 'rust',
-            '.go': 'go',
-            '.java': 'java',
-            '.c': 'c',
-            '.cpp': 'cpp',
-            '.h': 'c',
-            '.hpp': 'cpp',
-            '.cs': 'csharp',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.r': 'r',
-            '.xml': 'xml',
-            '.toml': 'toml',
-            '.ini': 'ini',
-            '.cfg': 'ini',
-            '.env': 'dotenv',
-            '.gitignore': 'ignore',
-        }
-        ext = Path(file_path).suffix.lower()
-        return ext_map.get(ext, 'plaintext')
+        return _EXTENSION_LANGUAGES.get(os.path.splitext(file_path)[1].lower(), 'plaintext')
 
     def get_latest_activity(self) -> Optional[WorkspaceActivity]:
         # Implementation skipped for brevity, safe to return None
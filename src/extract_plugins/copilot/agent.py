@@ -1,6 +1,9 @@
 """Copilot workspace extractor - adapts consolidated copilot implementation to agent framework."""
 from __future__ import annotations
 
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 
@@ -13,12 +16,33 @@ from src.shared.models.workspace import WorkspaceInfo
 
 # Import the consolidated implementation
 from .extractor import (
+    _list_session_entries,
     discover_workspaces, 
     extract_workspace, 
     WorkspaceMeta, 
 )
 
 
+_ROLE_MARKER = b'"role"'
+
+
+def _count_roles(session_file: str) -> int:
+    """Count '"role"' occurrences in a session file without decoding or copying it (0 if unreadable)."""
+    try:
+        with open(session_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0  # mmap cannot map an empty file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                count = 0
+                pos = mm.find(_ROLE_MARKER)
+                while pos != -1:
+                    count += 1
+                    pos = mm.find(_ROLE_MARKER, pos + len(_ROLE_MARKER))
+                return count
+    except OSError:
+        return 0
+
+
 class CopilotExtractor(AgentExtractor):
     """Copilot extractor using the clean consolidated copilot implementation.
     
@@ -54,8 +78,7 @@ class CopilotExtractor(AgentExtractor):
             self._workspace_cache[meta.workspace_id] = meta
             
             # Count sessions
-            chat_dir = meta.path / "chatSessions"
-            session_count = len(list(chat_dir.glob("*.json"))) if chat_dir.exists() else 0
+            session_count = len(_list_session_entries(meta.path / "chatSessions"))
             
             result.append(WorkspaceInfo(
                 workspace_id=meta.workspace_id,
@@ -100,17 +123,15 @@ class CopilotExtractor(AgentExtractor):
         if not chat_dir.exists():
             return None
         
-        session_ids = []
-        turn_count = 0
+        entries = _list_session_entries(chat_dir)
+        session_ids = [entry.name[:-len(".json")] for entry in entries]
         
-        for session_file in chat_dir.glob("*.json"):
-            session_ids.append(session_file.stem)
-            # Quick estimate: read file and count "role" occurrences
-            try:
-                content = session_file.read_text(encoding="utf-8")
-                turn_count += content.count('"role"')
-            except OSError:
-                pass
+        # Quick estimate: count "role" occurrences in the raw bytes. File reads
+        # release the GIL, so the per-file counts can overlap.
+        turn_count = 0
+        if entries:
+            with ThreadPoolExecutor(max_workers=min(8, len(entries))) as executor:
+                turn_count = sum(executor.map(_count_roles, (entry.path for entry in entries)))
         
         return WorkspaceActivity(
             session_count=len(session_ids),
@@ -4,17 +4,23 @@ Handles extraction of file diffs from chatEditingSessions folders.
 """
 from __future__ import annotations
 
-import json
+import os
 import re
+from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from src.shared.models.turn import CodeEdit
+from src.shared.io.json_loads import loads as _json_loads
 from src.shared.io.paths import decode_file_uri
 
 
 EMPTY_HASH_PREFIX = "da39a3e"
 
+_TELEMETRY_REQUEST_ID_RE = re.compile(r"requestId=([^;}\s]+)")
+
+_EDIT_SOURCE_KEYS = (b'"fileBaselines"', b'"recentSnapshot"', b'"linearHistory"')
+
 
 def extract_edits(session_folder: Path) -> list[CodeEdit]:
     """Extract code edits from a chatEditingSessions folder."""
@@ -25,11 +31,16 @@ def extract_edits(session_folder: Path) -> list[CodeEdit]:
         return []
     
     try:
-        state = json.loads(state_path.read_text(encoding="utf-8"))
-    except:
+        raw = state_path.read_bytes()
+        # Every edit source lives under one of these keys; skip the parse when none appear
+        if not any(key in raw for key in _EDIT_SOURCE_KEYS):
+            return []
+        state = _json_loads(raw)
+    except (OSError, ValueError):  # ValueError covers JSON and UTF-8 decode errors
         return []
     
     edits = []
+    read_content = _content_reader(contents_dir)
     
     # Build initial content map
     uri_to_initial = {}
@@ -37,28 +48,29 @@ def extract_edits(session_folder: Path) -> list[CodeEdit]:
         if isinstance(item, list) and len(item) >= 2:
             uri_to_initial[item[0]] = item[1]
     
+    recent_entries = (state.get("recentSnapshot") or {}).get("entries") or []
+    
     # Try fileBaselines first (granular per-request diffs)
     timeline = state.get("timeline", {})
     baselines = timeline.get("fileBaselines", [])
     
     if baselines:
-        edits = _extract_from_baselines(baselines, state, contents_dir)
+        edits = _extract_from_baselines(baselines, recent_entries, read_content)
     
     # Fallback to recentSnapshot if no baseline edits found
-    if not edits and state.get("recentSnapshot", {}).get("entries"):
-        edits = _extract_from_snapshot(state, uri_to_initial, contents_dir)
+    if not edits and recent_entries:
+        edits = _extract_from_snapshot(recent_entries, uri_to_initial, read_content)
         
     # Fallback to linearHistory if still no edits found
     if not edits and state.get("linearHistory"):
-        edits = _extract_from_linear_history(state, contents_dir)
+        edits = _extract_from_linear_history(state, read_content)
     
     return edits
 
 
-def _extract_from_baselines(baselines: list, state: dict, contents_dir: Path) -> list[CodeEdit]:
+def _extract_from_baselines(baselines: list, recent_entries: list, read_content: Callable[[str], str]) -> list[CodeEdit]:
     """Extract diffs using fileBaselines (Spec 7.3)."""
-    # Group baselines by URI
-    uri_baselines: dict[str, list[tuple[str, str, int]]] = {}  # uri -> [(request_id, hash, epoch)]
+    steps: list[tuple[int, str, str, str]] = []  # (epoch, uri, request_id, hash)
     
     for item in baselines:
         if not isinstance(item, list) or len(item) < 2:
@@ -78,35 +90,43 @@ def _extract_from_baselines(baselines: list, state: dict, contents_dir: Path) ->
         epoch = info.get("epoch", 0)
         content_hash = info.get("content", "")
         
-        if uri not in uri_baselines:
-            uri_baselines[uri] = []
-        uri_baselines[uri].append((request_id, content_hash, epoch))
+        steps.append((epoch, uri, request_id, content_hash))
+    
+    # Group baselines by URI. One stable sort by epoch up front leaves every
+    # URI's steps in epoch order, so the groups need no sorting of their own.
+    steps.sort(key=lambda x: x[0])
+    uri_baselines: dict[str, list[tuple[str, str]]] = defaultdict(list)  # uri -> [(request_id, hash)]
+    for _, uri, request_id, content_hash in steps:
+        uri_baselines[uri].append((request_id, content_hash))
     
     # Build final content map
     uri_to_final = {}
-    for entry in state.get("recentSnapshot", {}).get("entries", []):
+    for entry in recent_entries:
         if isinstance(entry, dict):
             uri_to_final[entry.get("resource", "")] = entry.get("currentHash", "")
     
     edits = []
     for uri, bl_list in uri_baselines.items():
-        bl_list.sort(key=lambda x: x[2])  # Sort by epoch
+        file_path = decode_file_uri(uri)
+        language = _language_for(file_path)
         
-        for i, (request_id, before_hash, _) in enumerate(bl_list):
-            before = _read_content(before_hash, contents_dir)
-            
+        for i, (request_id, before_hash) in enumerate(bl_list):
             if i + 1 < len(bl_list):
                 after_hash = bl_list[i + 1][1]
             else:
                 after_hash = uri_to_final.get(uri, "")
             
-            after = _read_content(after_hash, contents_dir)
+            # Content is addressed by hash: same hash, same content, no edit
+            if before_hash == after_hash:
+                continue
+            
+            before = read_content(before_hash)
+            after = read_content(after_hash)
             
             if before != after:
-                file_path = decode_file_uri(uri)
                 edits.append(CodeEdit(
                     file_path=file_path,
-                    language=Path(file_path).suffix.lstrip("."),
+                    language=language,
                     code_before=before,
                     code_after=after,
                     extra={"request_id": request_id}
@@ -115,11 +135,11 @@ def _extract_from_baselines(baselines: list, state: dict, contents_dir: Path) ->
     return edits
 
 
-def _extract_from_snapshot(state: dict, uri_to_initial: dict, contents_dir: Path) -> list[CodeEdit]:
+def _extract_from_snapshot(recent_entries: list, uri_to_initial: dict, read_content: Callable[[str], str]) -> list[CodeEdit]:
     """Fallback: extract from recentSnapshot (Spec 7.5)."""
     edits = []
     
-    for entry in state.get("recentSnapshot", {}).get("entries", []):
+    for entry in recent_entries:
         if not isinstance(entry, dict):
             continue
         
@@ -131,14 +151,14 @@ def _extract_from_snapshot(state: dict, uri_to_initial: dict, contents_dir: Path
             continue
         
         request_id = _parse_telemetry_info(entry.get("telemetryInfo"))
-        before = _read_content(initial_hash, contents_dir)
-        after = _read_content(current_hash, contents_dir)
+        before = read_content(initial_hash)
+        after = read_content(current_hash)
         
         if before != after:
             file_path = decode_file_uri(uri)
             edits.append(CodeEdit(
                 file_path=file_path,
-                language=Path(file_path).suffix.lstrip("."),
+                language=_language_for(file_path),
                 code_before=before,
                 code_after=after,
                 extra={"request_id": request_id}
@@ -147,7 +167,7 @@ def _extract_from_snapshot(state: dict, uri_to_initial: dict, contents_dir: Path
     return edits
 
 
-def _extract_from_linear_history(state: dict, contents_dir: Path) -> list[CodeEdit]:
+def _extract_from_linear_history(state: dict, read_content: Callable[[str], str]) -> list[CodeEdit]:
     """Fallback: extract from linearHistory (Spec 7.6)."""
     edits = []
     
@@ -169,14 +189,14 @@ def _extract_from_linear_history(state: dict, contents_dir: Path) -> list[CodeEd
                 if original_hash == current_hash:
                     continue
                 
-                before = _read_content(original_hash, contents_dir)
-                after = _read_content(current_hash, contents_dir)
+                before = read_content(original_hash)
+                after = read_content(current_hash)
                 
                 if before != after:
                     file_path = decode_file_uri(uri)
                     edits.append(CodeEdit(
                         file_path=file_path,
-                        language=Path(file_path).suffix.lstrip("."),
+                        language=_language_for(file_path),
                         code_before=before,
                         code_after=after,
                         extra={"request_id": request_id}
@@ -185,6 +205,28 @@ def _extract_from_linear_history(state: dict, contents_dir: Path) -> list[CodeEd
     return edits
 
 
+def _language_for(file_path: str) -> str:
+    """Return the file extension without its dot (same as Path.suffix, without building a Path)."""
+    return os.path.splitext(file_path)[1][1:]
+
+
+def _content_reader(contents_dir: Path) -> Callable[[str], str]:
+    """Return _read_content bound to contents_dir, reading each hash at most once.
+    
+    Baseline steps share hashes (the "after" of one step is the "before" of the
+    next) and content files are named by hash, so repeats can be served from memory.
+    """
+    cache: dict[str, str] = {}
+    
+    def read(hash_or_content: str) -> str:
+        content = cache.get(hash_or_content)
+        if content is None:
+            content = cache[hash_or_content] = _read_content(hash_or_content, contents_dir)
+        return content
+    
+    return read
+
+
 def _read_content(hash_or_content: str, contents_dir: Path) -> str:
     """Read content by hash, or treat as literal if file doesn't exist."""
     if not hash_or_content:
@@ -199,7 +241,7 @@ def _read_content(hash_or_content: str, contents_dir: Path) -> str:
     if content_file.exists():
         try:
             return content_file.read_text(encoding="utf-8")
-        except:
+        except (OSError, UnicodeDecodeError):
             return ""
     
     # Treat as literal content
@@ -213,7 +255,7 @@ def _parse_telemetry_info(info: Any) -> str:
     
     if isinstance(info, str):
         # Format: @{requestId=xxx; agentId=...}
-        match = re.search(r"requestId=([^;}\s]+)", info)
+        match = _TELEMETRY_REQUEST_ID_RE.search(info)
         if match:
             return match.group(1)
     
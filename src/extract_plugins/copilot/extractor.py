@@ -1,22 +1,32 @@
 """Copilot Chat Data Extractor."""
 from __future__ import annotations
 
-import json
+import functools
 import os
 import platform
+import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
 from src.shared.models.turn import Turn
+from src.shared.io.json_loads import loads as _json_loads
 from src.shared.io.paths import normalize_path, decode_file_uri
+from src.shared.io.sqlite_readonly import connect_readonly
 
 from .edits import extract_edits
 
 
+@functools.cache
 def get_workspace_storage() -> Path:
-    """Get VS Code workspace storage path for current platform."""
+    """Get VS Code workspace storage path for current platform.
+    
+    Cached: the platform and home directory do not change during a run
+    (call get_workspace_storage.cache_clear() after changing them in tests).
+    """
     system = platform.system()
     if system == "Windows":
         return Path(os.environ.get("APPDATA", "")) / "Code/User/workspaceStorage"
@@ -26,6 +36,21 @@ def get_workspace_storage() -> Path:
         return Path.home() / ".config/Code/User/workspaceStorage"
 
 
+_EMPTY_CHECK_BYTES = 2048
+
+# Response item keys that name the tool an item invoked
+_TOOL_KEYS = ("toolId", "toolName")
+
+# Lowercased field names for request and model ids, matched case-insensitively anywhere in a request
+_REQUEST_ID_FIELDS = frozenset({"requestid", "requestuuid", "clientrequestid", "conversationid", "sessionid"})
+_MODEL_ID_FIELDS = frozenset({"modelid", "model", "responsemodel", "modelidentifier"})
+
+_PATH_SEPARATORS = os.sep + (os.altsep or "")
+
+# A bare code fence line: ``` plus an optional language tag, at most 15 chars in total
+_CODE_FENCE_RE = re.compile(r"\A```[^\n]{0,12}\Z")
+
+
 @dataclass
 class WorkspaceMeta:
     """Workspace metadata."""
@@ -39,42 +64,57 @@ class WorkspaceMeta:
 def discover_workspaces(base: Path | None = None) -> list[WorkspaceMeta]:
     """Discover all workspaces with chat sessions."""
     base = base or get_workspace_storage()
-    workspaces = []
     
     if not base.exists():
         return []
-        
-    for folder in base.iterdir():
-        if not folder.is_dir():
-            continue
-        chat_dir = folder / "chatSessions"
-        if not chat_dir.exists():
-            continue
-        
-        # Check for non-empty sessions
-        sessions = list(chat_dir.glob("*.json"))
-        if not sessions:
-            continue
-        
-        has_content = any(not _is_empty_session(s) for s in sessions)
-        if not has_content:
-            continue
-        
-        # Load metadata
-        meta = _load_workspace_meta(folder)
-        workspaces.append(meta)
     
-    return workspaces
+    # Folders are independent (session heads, workspace.json, state.vscdb), so
+    # their I/O can overlap; map keeps the directory order
+    with os.scandir(base) as it:
+        folders = [Path(entry.path) for entry in it if entry.is_dir()]
+    if not folders:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(folders))) as executor:
+        return [meta for meta in executor.map(_load_workspace_folder, folders) if meta]
 
 
-def _is_empty_session(path: Path) -> bool:
-    """Quick check if session has no requests (read first 2KB)."""
+def _load_workspace_folder(folder: Path) -> WorkspaceMeta | None:
+    """Load metadata for a workspace folder, or None if it has no non-empty chat sessions."""
+    # Check for non-empty sessions ([] when there is no chatSessions directory)
+    sessions = _list_session_entries(folder / "chatSessions")
+    if not sessions:
+        return None
+    
+    has_content = any(not _is_empty_session(s.path) for s in sessions)
+    if not has_content:
+        return None
+    
+    # Load metadata
+    return _load_workspace_meta(folder)
+
+
+def _is_empty_session(path: str | Path) -> bool:
+    """Quick check if session has no requests (scan the first 2KB as raw bytes)."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            head = f.read(2048)
-        return '"requests": []' in head or '"requests":[]' in head
-    except:
+        with open(path, "rb") as f:
+            head = f.read(_EMPTY_CHECK_BYTES)
+    except OSError:
         return True
+    return _has_empty_requests(head)
+
+
+def _has_empty_requests(head: bytes) -> bool:
+    """True if the head of a session file shows an empty requests list."""
+    return b'"requests": []' in head or b'"requests":[]' in head
+
+
+def _list_session_entries(chat_dir: Path) -> list[os.DirEntry]:
+    """List the *.json session files in a chatSessions directory ([] if it cannot be read)."""
+    try:
+        with os.scandir(chat_dir) as it:
+            return [entry for entry in it if entry.name.endswith(".json") and entry.is_file()]
+    except OSError:
+        return []
 
 
 def _load_workspace_meta(folder: Path) -> WorkspaceMeta:
@@ -87,12 +127,12 @@ def _load_workspace_meta(folder: Path) -> WorkspaceMeta:
     ws_json = folder / "workspace.json"
     if ws_json.exists():
         try:
-            data = json.loads(ws_json.read_text(encoding="utf-8"))
+            data = _json_loads(ws_json.read_bytes())
             uri = data.get("folder") or data.get("folderUri", "")
             if uri:
                 workspace_folder = decode_file_uri(uri)
                 workspace_name = Path(workspace_folder).name
-        except (json.JSONDecodeError, OSError, KeyError):
+        except (ValueError, OSError, KeyError):  # ValueError covers JSON and UTF-8 decode errors
             pass
     
     # Load session titles from state.vscdb
@@ -109,35 +149,43 @@ def _load_workspace_meta(folder: Path) -> WorkspaceMeta:
 
 def _load_session_titles(db_path: Path) -> dict[str, str]:
     """Query state.vscdb for session titles."""
-    titles = {}
     if not db_path.exists():
-        return titles
+        return {}
     try:
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.execute(
-            "SELECT value FROM ItemTable WHERE key = 'chat.ChatSessionStore.index'"
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with closing(connect_readonly(db_path)) as conn:
+            row = conn.execute(
+                "SELECT value FROM ItemTable WHERE key = 'chat.ChatSessionStore.index'"
+            ).fetchone()
         if row:
-            data = json.loads(row[0])
-            for sid, info in data.get("entries", {}).items():
-                if isinstance(info, dict) and "title" in info:
-                    titles[sid] = info["title"]
-    except (sqlite3.Error, json.JSONDecodeError, OSError):
+            entries = _json_loads(row[0]).get("entries", {})
+            return {
+                sid: info["title"]
+                for sid, info in entries.items()
+                if isinstance(info, dict) and "title" in info
+            }
+    except (sqlite3.Error, ValueError, OSError):
         pass
-    return titles
+    return {}
 
 
-def extract_session(path: Path, meta: WorkspaceMeta) -> list[Turn]:
-    """Extract all turns from a chat session file."""
+def extract_session(path: Path, meta: WorkspaceMeta, stat: os.stat_result | None = None) -> list[Turn]:
+    """Extract all turns from a chat session file.
+    
+    The file is read once; the empty-session check runs on the bytes already
+    read. Pass stat when the caller has it (e.g. from os.scandir) to skip
+    another stat for the fallback timestamp.
+    """
     session_id = path.stem
-    if _is_empty_session(path):
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return []
+    if _has_empty_requests(raw[:_EMPTY_CHECK_BYTES]):
         return []
     
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
+        data = _json_loads(raw)
+    except ValueError:
         return []
     
     requests = data.get("requests", [])
@@ -148,15 +196,17 @@ def extract_session(path: Path, meta: WorkspaceMeta) -> list[Turn]:
     session_name = data.get("customTitle", "") or meta.titles.get(session_id, "")
     
     turns = []
-    file_mtime_ms = int(path.stat().st_mtime * 1000)
+    try:
+        file_mtime_ms = int((stat or path.stat()).st_mtime * 1000)
+    except OSError:
+        file_mtime_ms = 0
     
     for i, req in enumerate(requests):
         timestamp_ms = _parse_timestamp(req, file_mtime_ms)
         timestamp_iso = datetime.fromtimestamp(
             timestamp_ms / 1000, tz=timezone.utc
         ).isoformat()
-        request_id = _find_field(req, ["requestId", "requestUUID", "clientRequestId", "conversationId", "sessionId"])
-        model_id = _find_field(req, ["modelId", "model", "responseModel", "modelIdentifier"])
+        request_id, model_id = _find_fields(req, _REQUEST_ID_FIELDS, _MODEL_ID_FIELDS)
         
         # User turn
         user_text = _extract_user_text(req)
@@ -214,13 +264,12 @@ def extract_session(path: Path, meta: WorkspaceMeta) -> list[Turn]:
 
 def _extract_response_time(req: dict) -> int:
     """Extract response time from result.timings.totalElapsed."""
-    result = req.get("result", {})
-    if isinstance(result, dict):
-        timings = result.get("timings", {})
-        if isinstance(timings, dict):
-            total_elapsed = timings.get("totalElapsed")
-            if isinstance(total_elapsed, (int, float)):
-                return int(total_elapsed)
+    try:
+        total_elapsed = req["result"]["timings"]["totalElapsed"]
+    except (KeyError, TypeError):  # missing level, or a level that is not a dict
+        return 0
+    if isinstance(total_elapsed, (int, float)):
+        return int(total_elapsed)
     return 0
 
 
@@ -246,35 +295,71 @@ def _parse_timestamp(req: dict, fallback_ms: int) -> int:
     return fallback_ms
 
 
-def _find_field(obj: dict, field_names: list[str], visited: set | None = None) -> str:
-    """Recursively search for the first matching field."""
-    if visited is None:
-        visited = set()
+def _find_fields(obj: dict, *lower_names: frozenset[str]) -> tuple[str, ...]:
+    """Recursively search for the first matching field of each lowercased name set, in one walk.
     
-    obj_id = id(obj)
-    if obj_id in visited:
-        return ""
-    visited.add(obj_id)
-    
-    # Check direct fields (case-insensitive)
-    lower_names = [n.lower() for n in field_names]
+    Per name set this gives the same answer as searching on its own: direct
+    fields (case-insensitive) win over nested ones, nested objects are searched
+    depth-first in order, and an empty value below the top level is skipped.
+    """
+    results: list[str | None] = [None] * len(lower_names)  # None: still searching
+    # Fast path: Copilot requests usually carry both ids at the top level, so
+    # the visited set and the recursion are only needed on a miss
+    descend = _match_direct_fields(obj, lower_names, results, range(len(lower_names)), True)
+    if descend:
+        _find_fields_below(obj, lower_names, results, descend, {id(obj)})
+    return tuple(r or "" for r in results)
+
+
+def _match_direct_fields(
+    obj: dict,
+    lower_names: tuple[frozenset[str], ...],
+    results: list[str | None],
+    pending: range | list[int],
+    is_root: bool,
+) -> list[int]:
+    """Check obj's own fields; return the pending name sets that must search its children."""
+    # A name set matched here is settled for this subtree, even by an empty nested value
+    settled: set[int] = set()
     for key, val in obj.items():
-        if key.lower() in lower_names and isinstance(val, (str, int)):
-            return str(val)
-    
-    # Recurse into nested objects
+        if not isinstance(val, (str, int)):
+            continue
+        key_lower = key.lower()
+        for i in pending:
+            if i not in settled and key_lower in lower_names[i]:
+                settled.add(i)
+                value = str(val)
+                if value or is_root:
+                    results[i] = value
+    return [i for i in pending if i not in settled]
+
+
+def _find_fields_below(
+    obj: dict,
+    lower_names: tuple[frozenset[str], ...],
+    results: list[str | None],
+    descend: list[int],
+    visited: set[int],
+) -> None:
+    """Search obj's nested objects depth-first, in order, for the name sets in descend."""
     for val in obj.values():
         if isinstance(val, dict):
-            result = _find_field(val, field_names, visited)
-            if result:
-                return result
+            children = (val,)
         elif isinstance(val, list):
-            for item in val:
-                if isinstance(item, dict):
-                    result = _find_field(item, field_names, visited)
-                    if result:
-                        return result
-    return ""
+            children = [item for item in val if isinstance(item, dict)]
+        else:
+            continue
+        for child in children:
+            descend = [i for i in descend if results[i] is None]
+            if not descend:
+                return
+            child_id = id(child)
+            if child_id in visited:
+                continue
+            visited.add(child_id)
+            child_descend = _match_direct_fields(child, lower_names, results, descend, False)
+            if child_descend:
+                _find_fields_below(child, lower_names, results, child_descend, visited)
 
 
 def _extract_user_text(req: dict) -> str:
@@ -293,14 +378,14 @@ def _extract_user_text(req: dict) -> str:
 
 def _extract_user_files(req: dict) -> list[str]:
     """Extract context files attached by user."""
-    files = []
+    files = set()
     variables = req.get("variableData", {}).get("variables", [])
     for v in variables:
         if v.get("kind") == "file":
             path = v.get("value", {}).get("path", "")
             if path:
-                files.append(normalize_path(path))
-    return sorted(set(files))
+                files.add(normalize_path(path))
+    return sorted(files)
 
 
 def _extract_filename_from_ref(ref: dict) -> str:
@@ -333,8 +418,8 @@ def _extract_filename_from_ref(ref: dict) -> str:
             path = uri.get("fsPath") or uri.get("path") or ""
     
     if path:
-        # Extract just the filename
-        return Path(path).name
+        # Extract just the filename (like Path.name, without building a Path)
+        return os.path.basename(path.rstrip(_PATH_SEPARATORS))
     
     return ""
 
@@ -428,9 +513,7 @@ def _extract_assistant_response(req: dict) -> tuple[str, list[str], list[str], s
         val = item.get("value", "")
         if isinstance(val, str) and val.strip():
             stripped = val.strip()
-            is_code_fence = stripped == "```" or (stripped.startswith("```") and len(stripped) <= 15 and "\n" not in stripped)
-            
-            if is_code_fence:
+            if _CODE_FENCE_RE.match(stripped):
                 if in_code_block_context:
                     # We're in a code block context, preserve this fence (closing)
                     text_parts.append(val)
@@ -443,7 +526,7 @@ def _extract_assistant_response(req: dict) -> tuple[str, list[str], list[str], s
                 text_parts.append(val)
         
         # Tools
-        for key in ["toolId", "toolName"]:
+        for key in _TOOL_KEYS:
             if item.get(key):
                 tools.add(item[key])
         
@@ -472,29 +555,41 @@ def _extract_assistant_response(req: dict) -> tuple[str, list[str], list[str], s
 
 def extract_workspace(meta: WorkspaceMeta) -> list[Turn]:
     """Extract all data from a single workspace, matching edits to turns."""
+    entries = _list_session_entries(meta.path / "chatSessions")
+    if not entries:
+        return []
+    
+    # Sessions are independent; map keeps the directory order of their turns
     turns = []
+    with ThreadPoolExecutor(max_workers=min(8, len(entries))) as executor:
+        for session_turns in executor.map(lambda entry: _extract_session_with_edits(entry, meta), entries):
+            turns.extend(session_turns)
     
-    chat_dir = meta.path / "chatSessions"
-    edits_dir = meta.path / "chatEditingSessions"
+    return turns
+
+
+def _extract_session_with_edits(entry: os.DirEntry, meta: WorkspaceMeta) -> list[Turn]:
+    """Extract a session's turns and attach the code edits from its editing session."""
+    session_file = Path(entry.path)
+    try:
+        stat = entry.stat()
+    except OSError:
+        return []
+    session_turns = extract_session(session_file, meta, stat)
     
-    for session_file in chat_dir.glob("*.json"):
-        session_turns = extract_session(session_file, meta)
+    # Check for corresponding edit session
+    edit_folder = meta.path / "chatEditingSessions" / session_file.stem
+    if edit_folder.exists():
+        session_edits = extract_edits(edit_folder)
         
-        # Check for corresponding edit session
-        edit_folder = edits_dir / session_file.stem
-        if edit_folder.exists():
-            session_edits = extract_edits(edit_folder)
-            
-            # Match edits to turns by request_id
-            for edit in session_edits:
-                req_id = edit.extra.get("request_id")
-                if req_id:
-                    # Find assistant turn with this request_id
-                    for turn in session_turns:
-                        if turn.role == "assistant" and turn.request_id == req_id:
-                            turn.code_edits.append(edit)
-                            break
-                            
-        turns.extend(session_turns)
-    
-    return turns
+        # Match edits to turns by request_id (first assistant turn with that id)
+        assistant_by_request: dict[str, Turn] = {}
+        for turn in session_turns:
+            if turn.role == "assistant" and turn.request_id:
+                assistant_by_request.setdefault(turn.request_id, turn)
+        for edit in session_edits:
+            turn = assistant_by_request.get(edit.extra.get("request_id"))
+            if turn is not None:
+                turn.code_edits.append(edit)
+    
+    return session_turns
@@ -19,6 +19,7 @@ from src.shared.models.workspace import WorkspaceInfo
 # Import the extraction implementation
 from .extractor import (
     discover_workspaces,
+    find_workspace,
     extract_workspace,
     get_workspace_activity,
     WorkspaceMeta,
@@ -191,12 +192,10 @@ class CursorExtractor(AgentExtractor):
             if gs_path:
                 global_db_path = Path(gs_path) / "state.vscdb"
         
-        # Discover all workspaces and find ours
-        for meta in discover_workspaces(workspace_storage, global_db_path):
+        # Load only our workspace rather than discovering (and opening) all of them
+        meta = find_workspace(self.workspace_id, workspace_storage, global_db_path)
+        if meta:
             self._workspace_cache[meta.workspace_id] = meta
-            if meta.workspace_id == self.workspace_id:
-                self._meta = meta
-                return meta
-        
-        return None
+            self._meta = meta
+        return meta
 
@@ -5,6 +5,7 @@ Handles parsing of raw bubble data from the Cursor database into BubbleData obje
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -12,9 +13,9 @@ from src.shared.io.paths import normalize_path
 from src.shared.text.stupid_text_cleaner import coerce_text
 
 
-@dataclass
+@dataclass(slots=True)
 class BubbleData:
-    """Parsed bubble data from database."""
+    """Parsed bubble data from database (slotted: one per bubble, no instance dict)."""
     bubble_id: str
     type: int  # 1 = user, 2 = assistant
     text: str = ""
@@ -28,48 +29,62 @@ class BubbleData:
     codeblock_ids: List[str] = field(default_factory=list)
 
 
+# Accepted epoch-ms range: from 2020-01-01 up to datetime's year-9999 limit
+_MIN_TIMESTAMP_MS = 1577836800000
+_MAX_TIMESTAMP_MS = 253402300800000
+
+
 def parse_timestamp(value: Any) -> Tuple[Optional[int], Optional[str]]:
     """Parse various timestamp formats into (ms, iso) tuple."""
-    if value is None:
+    timestamp_ms = parse_timestamp_ms(value)
+    if timestamp_ms is None:
         return None, None
+    return timestamp_ms, ms_to_iso(timestamp_ms)
+
+
+def parse_timestamp_ms(value: Any) -> Optional[int]:
+    """Parse various timestamp formats into epoch ms, for callers that need no ISO string."""
+    if value is None or not isinstance(value, (str, int, float)):
+        return None
+    return _parse_timestamp_ms_cached(value)
+
+
+def ms_to_iso(timestamp_ms: int) -> str:
+    """Format epoch ms (as returned by parse_timestamp_ms) as a UTC ISO string."""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp_ms_cached(value: str | int | float) -> Optional[int]:
+    """Parse a str or numeric timestamp for parse_timestamp_ms.
     
-    timestamp_ms = None
-    
+    Cached: a session repeats the same createdAt and timing values across
+    its bubbles, and the result depends only on the value.
+    """
     if isinstance(value, str):
         stripped = value.strip()
         if not stripped:
-            return None, None
+            return None
         
         # Try numeric string
         if stripped.isdigit():
             timestamp_ms = int(stripped)
         else:
-            # Try ISO format
+            # Try ISO format (fromisoformat accepts a trailing "Z" since 3.11)
             try:
-                iso_str = stripped.replace("Z", "+00:00")
-                dt = datetime.fromisoformat(iso_str)
+                dt = datetime.fromisoformat(stripped)
                 if dt.tzinfo is None:
                     dt = dt.replace(tzinfo=timezone.utc)
                 timestamp_ms = int(dt.timestamp() * 1000)
             except ValueError:
-                return None, None
-    elif isinstance(value, (int, float)):
+                return None
+    else:
         timestamp_ms = int(value)
     
-    if timestamp_ms is None:
-        return None, None
-    
-    # Validate timestamp is reasonable (after 2020)
-    if timestamp_ms < 1577836800000:
-        return None, None
-    
-    # Convert to ISO
-    try:
-        dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
-        timestamp_iso = dt.isoformat()
-        return timestamp_ms, timestamp_iso
-    except (ValueError, OSError, OverflowError):
-        return None, None
+    # Validate timestamp is reasonable (after 2020) and representable as a datetime
+    if not _MIN_TIMESTAMP_MS <= timestamp_ms < _MAX_TIMESTAMP_MS:
+        return None
+    return timestamp_ms
 
 
 def extract_bubble_timestamp(bubble_data: Dict[str, Any]) -> Tuple[Optional[int], Optional[str]]:
@@ -126,22 +141,24 @@ def parse_bubble(bubble_id: str, bubble_data: Dict[str, Any]) -> BubbleData:
     for block in bubble_data.get("codeBlocks", []):
         if not isinstance(block, dict):
             continue
+        block_get = block.get
         
-        uri = block.get("uri", {})
+        uri = block_get("uri")
         file_path = ""
         if isinstance(uri, dict):
             file_path = uri.get("fsPath") or uri.get("path") or uri.get("_fsPath") or ""
         
+        codeblock_id = block_get("codeblockId", "")
         code_blocks.append({
             "file_path": normalize_path(file_path),
-            "content": block.get("content", ""),
-            "language_id": block.get("languageId", ""),
-            "codeblock_id": block.get("codeblockId", ""),
-            "codeblock_idx": block.get("codeBlockIdx", 0),
+            "content": block_get("content", ""),
+            "language_id": block_get("languageId", ""),
+            "codeblock_id": codeblock_id,
+            "codeblock_idx": block_get("codeBlockIdx", 0),
         })
         
-        if block.get("codeblockId"):
-            codeblock_ids.append(block["codeblockId"])
+        if codeblock_id:
+            codeblock_ids.append(codeblock_id)
     
     return BubbleData(
         bubble_id=bubble_id,
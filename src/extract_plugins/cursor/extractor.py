@@ -1,25 +1,55 @@
 """Cursor Chat Data Extractor."""
 from __future__ import annotations
 
-import json
+import functools
 import os
 import platform
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from src.shared.models.turn import Turn
+from src.shared.io.json_loads import loads as _json_loads
 from src.shared.io.paths import normalize_path, decode_file_uri
+from src.shared.io.sqlite_readonly import connect_readonly
 from src.shared.logging.logger import get_logger
 
-from .bubbles import BubbleData, parse_bubble, parse_timestamp
+from .bubbles import BubbleData, parse_bubble, parse_timestamp_ms
 from .turns import WorkspaceMeta, TurnBuilder
 
 logger = get_logger(__name__)
 
+# Key range covering every 'inlineDiffUndoRedo...' key (prefix, prefix with last char incremented)
+_INLINE_DIFF_KEY_RANGE = ("inlineDiffUndoRedo", "inlineDiffUndoRedp")
 
+# cursorDiskKV key prefix of composer records ("composerData:<composer_id>")
+_COMPOSER_KEY_PREFIX = "composerData:"
+
+# Keys per IN (...) query, below SQLite's historical 999 bound-parameter limit
+_KEY_QUERY_BATCH = 500
+
+# composerData markers: a conversation list opening with an object means the
+# composer has content; with neither key present it has none
+_CONTENT_MARKERS = (b'"fullConversationHeadersOnly":[{', b'"conversation":[{')
+_CONVERSATION_KEYS = (b'"fullConversationHeadersOnly"', b'"conversation"')
+
+# Pragmas set by _open_ro: up to 64 MB page cache, 256 MB memory map, in-memory temp tables
+_READ_PRAGMAS = (
+    "PRAGMA query_only=1;"
+    " PRAGMA cache_size=-65536;"
+    " PRAGMA mmap_size=268435456;"
+    " PRAGMA temp_store=MEMORY;"
+)
+
+
+@functools.cache
 def _get_cursor_user_dir() -> Path:
-    """Get Cursor User directory for current platform."""
+    """Get Cursor User directory for current platform.
+    
+    Cached: the platform and home directory do not change during a run
+    (call _get_cursor_user_dir.cache_clear() after changing them in tests).
+    """
     system = platform.system()
     if system == "Windows":
         return Path(os.environ.get("APPDATA", "")) / "Cursor/User"
@@ -48,16 +78,58 @@ def _get_global_db_path() -> Path:
 # Database Query Functions
 # =============================================================================
 
+class _ReadOnlyConnection(sqlite3.Connection):
+    """Read-only connection that remembers which tables exist.
+    
+    The schema cannot change through a read-only connection, so
+    _table_exists answers from known_tables after the first lookup.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.known_tables: Dict[str, bool] = {}
+
+
+def _open_ro(db_path: Path) -> sqlite3.Connection:
+    """Open a state.vscdb read-only, tuned for bulk reads."""
+    conn = connect_readonly(db_path, factory=_ReadOnlyConnection)
+    conn.executescript(_READ_PRAGMAS)
+    return conn
+
+
+def _loads_value(value: Any) -> Any:
+    """Parse a JSON value read from a state.vscdb table.
+    
+    BLOB values go to the parser as raw bytes; only values that are not
+    valid UTF-8 are decoded (dropping the bad bytes) and parsed again.
+    """
+    try:
+        return _json_loads(value)
+    except ValueError:
+        if not isinstance(value, bytes):
+            raise
+        return _json_loads(value.decode("utf-8", errors="ignore"))
+
+
 def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
-    """Check if a table exists in the database."""
+    """Check if a table exists in the database.
+    
+    Cached per connection for connections opened by _open_ro.
+    """
+    known_tables = getattr(conn, "known_tables", None)
+    if known_tables is not None and table_name in known_tables:
+        return known_tables[table_name]
     try:
         cursor = conn.execute(
             "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
             (table_name,)
         )
-        return cursor.fetchone() is not None
+        exists = cursor.fetchone() is not None
     except sqlite3.Error:
         return False
+    if known_tables is not None:
+        known_tables[table_name] = exists
+    return exists
 
 
 def _query_composer_data(conn: sqlite3.Connection, composer_id: str) -> Optional[Dict[str, Any]]:
@@ -65,53 +137,71 @@ def _query_composer_data(conn: sqlite3.Connection, composer_id: str) -> Optional
     try:
         cursor = conn.execute(
             "SELECT value FROM cursorDiskKV WHERE key = ?",
-            (f"composerData:{composer_id}",)
+            (_COMPOSER_KEY_PREFIX + composer_id,)
         )
         row = cursor.fetchone()
         if row and row[0]:
-            value = row[0]
-            if isinstance(value, bytes):
-                value = value.decode("utf-8", errors="ignore")
-            return json.loads(value)
-    except (sqlite3.Error, json.JSONDecodeError) as e:
+            return _loads_value(row[0])
+    except (sqlite3.Error, ValueError) as e:
         logger.debug(f"Error querying composer {composer_id}: {e}")
     return None
 
 
-def _query_bubble_data(conn: sqlite3.Connection, composer_id: str, bubble_id: str) -> Optional[Dict[str, Any]]:
-    """Query bubble data from cursorDiskKV table."""
-    try:
-        cursor = conn.execute(
-            "SELECT value FROM cursorDiskKV WHERE key = ?",
-            (f"bubbleId:{composer_id}:{bubble_id}",)
+def _query_values(conn: sqlite3.Connection, keys: List[str]) -> Iterator[Tuple[str, Any]]:
+    """Yield (key, value) rows of cursorDiskKV for the given keys.
+    
+    Fetches in batches of _KEY_QUERY_BATCH keys per IN (...) query instead
+    of one query per key. Missing keys are skipped; row order is unspecified.
+    """
+    keys = list(dict.fromkeys(keys))
+    for start in range(0, len(keys), _KEY_QUERY_BATCH):
+        batch = keys[start:start + _KEY_QUERY_BATCH]
+        yield from conn.execute(
+            f"SELECT key, value FROM cursorDiskKV WHERE key IN ({','.join('?' * len(batch))})",
+            batch,
         )
-        row = cursor.fetchone()
-        if row and row[0]:
-            value = row[0]
-            if isinstance(value, bytes):
-                value = value.decode("utf-8", errors="ignore")
-            return json.loads(value)
-    except (sqlite3.Error, json.JSONDecodeError) as e:
-        logger.debug(f"Error querying bubble {bubble_id}: {e}")
-    return None
+
+
+def _query_bubbles(conn: sqlite3.Connection, composer_id: str, bubble_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Query bubble data for many bubbles from cursorDiskKV table.
+    
+    Returns bubble_id -> data; bubbles that are missing or fail to parse
+    are left out.
+    """
+    prefix = f"bubbleId:{composer_id}:"
+    prefix_len = len(prefix)
+    result = {}
+    try:
+        for key, value in _query_values(conn, [prefix + bubble_id for bubble_id in bubble_ids]):
+            if not value:
+                continue
+            try:
+                result[key[prefix_len:]] = _loads_value(value)
+            except ValueError as e:
+                logger.debug(f"Error parsing bubble {key}: {e}")
+    except sqlite3.Error as e:
+        logger.debug(f"Error querying bubbles for composer {composer_id}: {e}")
+    return result
 
 
 def _query_inline_diffs(conn: sqlite3.Connection, composer_id: str) -> Dict[str, Dict[str, Any]]:
     """Query all inlineDiffUndoRedo entries for a composer.
     
     Returns a dict mapping codeblock_id -> {before_lines, after_lines, file_path}
+    
+    Uses a key range rather than LIKE so SQLite can seek on the key index
+    (LIKE is case-insensitive and never uses the default-collation index).
     """
     result = {}
     try:
         cursor = conn.execute(
-            "SELECT key, value FROM cursorDiskKV WHERE key LIKE 'inlineDiffUndoRedo%'"
+            "SELECT key, value FROM cursorDiskKV WHERE key >= ? AND key < ?",
+            _INLINE_DIFF_KEY_RANGE,
         )
         for row in cursor:
             key, value = row
-            if isinstance(value, bytes):
-                value = value.decode("utf-8", errors="ignore")
             try:
-                data = json.loads(value)
+                data = _loads_value(value)
                 metadata = data.get("composerMetadata", {})
                 if metadata.get("composerId") == composer_id:
                     codeblock_id = metadata.get("codeblockId", "")
@@ -123,7 +213,7 @@ def _query_inline_diffs(conn: sqlite3.Connection, composer_id: str) -> Dict[str,
                             "after_lines": data.get("newTextLines", []),
                             "file_path": normalize_path(file_path),
                         }
-            except json.JSONDecodeError:
+            except ValueError:
                 continue
     except sqlite3.Error as e:
         logger.debug(f"Error querying inline diffs: {e}")
@@ -154,12 +244,7 @@ def discover_workspaces(
         return []
     
     # Open global database once for all validation (optional - some data lives here)
-    global_conn = None
-    if global_db_path.exists():
-        try:
-            global_conn = sqlite3.connect(str(global_db_path))
-        except sqlite3.Error as e:
-            logger.debug(f"Could not open Cursor global database (may be locked): {e}")
+    global_conn = _open_global_db(global_db_path)
     
     workspaces = []
     
@@ -186,6 +271,48 @@ def discover_workspaces(
     return workspaces
 
 
+def find_workspace(
+    workspace_id: str,
+    workspace_storage: Optional[Path] = None,
+    global_db_path: Optional[Path] = None
+) -> Optional[WorkspaceMeta]:
+    """Load a single workspace by its workspaceStorage folder name.
+    
+    Same checks as discover_workspaces, but only this workspace's database is
+    opened. Returns None if the workspace has no extractable sessions.
+    """
+    workspace_storage = workspace_storage or get_workspace_storage()
+    global_db_path = global_db_path or _get_global_db_path()
+    
+    folder = workspace_storage / workspace_id
+    workspace_db = folder / "state.vscdb"
+    if Path(workspace_id).name != workspace_id or not workspace_db.exists():
+        return None
+    
+    global_conn = _open_global_db(global_db_path)
+    try:
+        meta = _load_workspace_meta(folder, workspace_db, global_conn)
+    except Exception as e:
+        logger.debug(f"Error loading workspace {workspace_id}: {e}")
+        return None
+    finally:
+        if global_conn:
+            global_conn.close()
+    
+    return meta if meta and meta.composer_ids else None
+
+
+def _open_global_db(global_db_path: Path) -> Optional[sqlite3.Connection]:
+    """Open the global database if present; None if missing or unreadable."""
+    if not global_db_path.exists():
+        return None
+    try:
+        return _open_ro(global_db_path)
+    except sqlite3.Error as e:
+        logger.debug(f"Could not open Cursor global database (may be locked): {e}")
+        return None
+
+
 def _load_workspace_meta(
     folder: Path, 
     workspace_db: Path,
@@ -200,39 +327,37 @@ def _load_workspace_meta(
     ws_json = folder / "workspace.json"
     if ws_json.exists():
         try:
-            data = json.loads(ws_json.read_text(encoding="utf-8"))
+            data = _json_loads(ws_json.read_bytes())
             uri = data.get("folder") or data.get("folderUri", "")
             if uri:
                 workspace_folder = decode_file_uri(uri)
                 if workspace_folder:
                     workspace_name = Path(workspace_folder).name or workspace_folder
-        except (json.JSONDecodeError, OSError):
+        except (ValueError, OSError):
             pass
     
     # Get composer list from workspace's ItemTable
     composer_ids = []
     workspace_conn = None
     try:
-        workspace_conn = sqlite3.connect(str(workspace_db))
+        workspace_conn = _open_ro(workspace_db)
         cursor = workspace_conn.execute(
             "SELECT value FROM ItemTable WHERE key = 'composer.composerData'"
         )
         row = cursor.fetchone()
         if row and row[0]:
-            value = row[0]
-            if isinstance(value, bytes):
-                value = value.decode("utf-8", errors="ignore")
-            data = json.loads(value)
+            data = _loads_value(row[0])
             all_composers = data.get("allComposers", [])
+            candidates = [
+                composer_info.get("composerId")
+                for composer_info in all_composers
+                if isinstance(composer_info, dict) and composer_info.get("composerId")
+            ]
             
             # Validate each composer has extractable data
-            for composer_info in all_composers:
-                composer_id = composer_info.get("composerId") if isinstance(composer_info, dict) else None
-                if composer_id and _validate_composer_has_data(
-                    composer_id, global_conn, workspace_conn
-                ):
-                    composer_ids.append(composer_id)
-    except (sqlite3.Error, json.JSONDecodeError) as e:
+            with_data = _composers_with_data(candidates, global_conn, workspace_conn)
+            composer_ids = [composer_id for composer_id in candidates if composer_id in with_data]
+    except (sqlite3.Error, ValueError) as e:
         logger.debug(f"Error reading composers from workspace {workspace_id}: {e}")
     finally:
         if workspace_conn:
@@ -250,35 +375,58 @@ def _load_workspace_meta(
     )
 
 
-def _validate_composer_has_data(
-    composer_id: str,
+def _composers_with_data(
+    composer_ids: List[str],
     global_conn: Optional[sqlite3.Connection],
     workspace_conn: sqlite3.Connection
-) -> bool:
-    """Validate that a composer has actual extractable content."""
-    # Try global database first
-    if global_conn:
-        data = _query_composer_data(global_conn, composer_id)
-        if data:
-            has_content = (
-                len(data.get("fullConversationHeadersOnly", [])) > 0 or
-                len(data.get("conversation", [])) > 0
-            )
-            if has_content:
-                return True
+) -> Set[str]:
+    """Return the composer IDs that have actual extractable content.
     
-    # Fallback: check workspace database
+    Checks the global database first, then the workspace database for the
+    rest, with one batched query per database instead of one per composer.
+    """
+    with_data: Set[str] = set()
+    prefix_len = len(_COMPOSER_KEY_PREFIX)
+    conns = [global_conn] if global_conn else []
     if _table_exists(workspace_conn, "cursorDiskKV"):
-        data = _query_composer_data(workspace_conn, composer_id)
-        if data:
-            has_content = (
-                len(data.get("fullConversationHeadersOnly", [])) > 0 or
-                len(data.get("conversation", [])) > 0
-            )
-            if has_content:
-                return True
+        conns.append(workspace_conn)
     
-    return False
+    for conn in conns:
+        pending = [composer_id for composer_id in composer_ids if composer_id not in with_data]
+        if not pending:
+            break
+        try:
+            keys = [_COMPOSER_KEY_PREFIX + composer_id for composer_id in pending]
+            for key, value in _query_values(conn, keys):
+                if value and _composer_has_content(value):
+                    with_data.add(key[prefix_len:])
+        except sqlite3.Error as e:
+            logger.debug(f"Error querying composers: {e}")
+    
+    return with_data
+
+
+def _composer_has_content(value: Any) -> bool:
+    """Check whether a stored composerData value has any conversation.
+    
+    Decides from byte markers when they are conclusive and parses the JSON
+    only otherwise (e.g. pretty-printed values or empty lists).
+    """
+    if not isinstance(value, (str, bytes)):
+        return False
+    raw = value if isinstance(value, bytes) else value.encode("utf-8")
+    if any(marker in raw for marker in _CONTENT_MARKERS):
+        return True
+    if not any(key in raw for key in _CONVERSATION_KEYS):
+        return False
+    try:
+        data = _loads_value(value)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and (
+        len(data.get("fullConversationHeadersOnly", [])) > 0 or
+        len(data.get("conversation", [])) > 0
+    )
 
 
 # =============================================================================
@@ -331,15 +479,16 @@ def extract_session(
     # Extract additional data for code edits
     inline_diffs = _query_inline_diffs(conn_to_use, composer_id)
     
-    original_file_states = {}
-    for uri, state_data in composer_data.get("originalFileStates", {}).items():
-        if isinstance(state_data, dict) and "content" in state_data:
-            original_file_states[uri] = state_data["content"]
+    original_file_states = {
+        uri: state_data["content"]
+        for uri, state_data in composer_data.get("originalFileStates", {}).items()
+        if isinstance(state_data, dict) and "content" in state_data
+    }
     
     # Get session metadata
     session_name = composer_data.get("name", "") or ""
     session_timestamp = composer_data.get("createdAt") or composer_data.get("lastUpdatedAt")
-    session_ts_ms, _ = parse_timestamp(session_timestamp)
+    session_ts_ms = parse_timestamp_ms(session_timestamp)
     
     # Extract model info from usageData or modelConfig for propagation
     usage_data = composer_data.get("usageData", {})
@@ -378,16 +527,16 @@ def _extract_bubbles_schema_a(
 ) -> List[BubbleData]:
     """Extract bubbles using Schema A (fullConversationHeadersOnly)."""
     bubbles = []
-    last_timestamp_ms = None
-    last_timestamp_iso = None
-    last_model_info = None
+    bubble_data_by_id = _query_bubbles(
+        conn, composer_id, [header.get("bubbleId", "") for header in headers if header.get("bubbleId")]
+    )
     
     for header in headers:
         bubble_id = header.get("bubbleId", "")
         if not bubble_id:
             continue
         
-        bubble_data = _query_bubble_data(conn, composer_id, bubble_id)
+        bubble_data = bubble_data_by_id.get(bubble_id)
         if not bubble_data:
             # Use header info if bubble not found
             bubble = BubbleData(
@@ -396,41 +545,33 @@ def _extract_bubbles_schema_a(
             )
         else:
             bubble = parse_bubble(bubble_id, bubble_data)
-        
-        # Propagate timestamp if missing
-        if not bubble.timestamp_ms:
-            bubble.timestamp_ms = last_timestamp_ms
-            bubble.timestamp_iso = last_timestamp_iso
-        else:
-            last_timestamp_ms = bubble.timestamp_ms
-            last_timestamp_iso = bubble.timestamp_iso
-        
-        # Propagate model_info for assistant bubbles
-        if bubble.type == 2:  # assistant
-            if bubble.model_info:
-                last_model_info = bubble.model_info
-            elif last_model_info:
-                bubble.model_info = last_model_info
-        
         bubbles.append(bubble)
     
+    _propagate_metadata(bubbles)
     return bubbles
 
 
 def _extract_bubbles_schema_b(conversation: List[Dict[str, Any]]) -> List[BubbleData]:
     """Extract bubbles using Schema B (inline conversation)."""
     bubbles = []
-    last_timestamp_ms = None
-    last_timestamp_iso = None
-    last_model_info = None
     
     for item in conversation:
         bubble_id = item.get("bubbleId", "")
         if not bubble_id:
             continue
-        
-        bubble = parse_bubble(bubble_id, item)
-        
+        bubbles.append(parse_bubble(bubble_id, item))
+    
+    _propagate_metadata(bubbles)
+    return bubbles
+
+
+def _propagate_metadata(bubbles: List[BubbleData]) -> None:
+    """Fill missing timestamps and assistant model_info from earlier bubbles, in place."""
+    last_timestamp_ms = None
+    last_timestamp_iso = None
+    last_model_info = None
+    
+    for bubble in bubbles:
         # Propagate timestamp if missing
         if not bubble.timestamp_ms:
             bubble.timestamp_ms = last_timestamp_ms
@@ -445,10 +586,6 @@ def _extract_bubbles_schema_b(conversation: List[Dict[str, Any]]) -> List[Bubble
                 last_model_info = bubble.model_info
             elif last_model_info:
                 bubble.model_info = last_model_info
-        
-        bubbles.append(bubble)
-    
-    return bubbles
 
 
 # =============================================================================
@@ -461,42 +598,68 @@ def extract_workspace(
 ) -> Tuple[List[Turn], int]:
     """Extract all turns from a single workspace.
     
+    Composers are split into contiguous chunks, one per worker thread (up to
+    8); each worker opens its own database connections, since sqlite3
+    connections are not shared across threads. Turns keep composer order.
+    
     Returns:
         Tuple of (turns, session_count)
     """
     global_db_path = global_db_path or _get_global_db_path()
     workspace_db = meta.path / "state.vscdb"
+    composer_ids = meta.composer_ids
+    if not composer_ids:
+        return [], 0
+    
+    workers = min(8, len(composer_ids))
+    chunk_size = -(-len(composer_ids) // workers)
+    chunks = [composer_ids[i:i + chunk_size] for i in range(0, len(composer_ids), chunk_size)]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        results = executor.map(
+            lambda chunk: _extract_sessions(chunk, meta, global_db_path, workspace_db), chunks
+        )
+        sessions = [turns for chunk_turns in results for turns in chunk_turns]
+    
+    all_turns: List[Turn] = [turn for turns in sessions for turn in turns]
+    session_count = sum(1 for turns in sessions if turns)
+    return all_turns, session_count
+
+
+def _extract_sessions(
+    composer_ids: List[str],
+    meta: WorkspaceMeta,
+    global_db_path: Path,
+    workspace_db: Path,
+) -> List[List[Turn]]:
+    """Extract composers over connections owned by the calling thread.
     
+    Returns one list of turns per composer (empty when extraction fails).
+    """
     global_conn = None
     workspace_conn = None
     
     try:
         # Open database connections
         if global_db_path.exists():
-            global_conn = sqlite3.connect(str(global_db_path))
+            global_conn = _open_ro(global_db_path)
         
         if workspace_db.exists():
-            workspace_conn = sqlite3.connect(str(workspace_db))
-        
-        all_turns: List[Turn] = []
-        session_count = 0
+            workspace_conn = _open_ro(workspace_db)
         
-        for composer_id in meta.composer_ids:
+        sessions: List[List[Turn]] = []
+        for composer_id in composer_ids:
             try:
-                turns = extract_session(
+                sessions.append(extract_session(
                     composer_id=composer_id,
                     workspace_meta=meta,
                     global_conn=global_conn,
                     workspace_conn=workspace_conn,
-                )
-                if turns:
-                    all_turns.extend(turns)
-                    session_count += 1
+                ))
             except Exception as e:
                 logger.warning(f"Failed to extract session {composer_id}: {e}")
-                continue
+                sessions.append([])
         
-        return all_turns, session_count
+        return sessions
         
     finally:
         if global_conn:
@@ -570,10 +733,10 @@ def get_workspace_activity(
     
     try:
         if global_db_path.exists():
-            global_conn = sqlite3.connect(str(global_db_path))
+            global_conn = _open_ro(global_db_path)
         
         if workspace_db.exists():
-            workspace_conn = sqlite3.connect(str(workspace_db))
+            workspace_conn = _open_ro(workspace_db)
         
         session_ids = []
         turn_count = 0
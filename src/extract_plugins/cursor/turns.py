@@ -5,7 +5,6 @@ Handles building Turn objects from bubbles with merging and deduplication.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from src.shared.models.turn import Turn, CodeEdit
@@ -13,6 +12,7 @@ from src.shared.io.paths import normalize_path, decode_file_uri
 
 from .bubbles import (
     BubbleData,
+    ms_to_iso,
     is_thinking_only_bubble,
     should_skip_bubble,
     should_merge_bubble,
@@ -169,8 +169,7 @@ class TurnBuilder:
         timestamp_iso = None
         if timestamp_ms:
             try:
-                dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
-                timestamp_iso = dt.isoformat()
+                timestamp_iso = ms_to_iso(timestamp_ms)
             except (ValueError, OSError, OverflowError):
                 pass
         
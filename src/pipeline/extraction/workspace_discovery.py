@@ -5,8 +5,9 @@ Handles finding, listing, and merging workspace information from different agent
 
 from __future__ import annotations
 
+import heapq
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from src.shared.logging.logger import get_logger
 from src.shared.models.workspace import WorkspaceInfo, WorkspaceActivity
@@ -80,34 +81,53 @@ def clear_workspace_folders_cache() -> None:
     _workspace_folders_cache = None
 
 
+def _workspace_sort_key(ws: WorkspaceInfo) -> str:
+    """Sort key for workspace listings: name, falling back to ID."""
+    return ws.workspace_name.lower() or ws.workspace_id.lower()
+
+
 def list_all_workspaces() -> List[WorkspaceInfo]:
     """Get all workspaces from all registered agents, merged by workspace_id."""
-    agent_workspaces: Dict[str, List[WorkspaceInfo]] = {}
-    for agent_name in list_registered_agents():
-        ExtractorClass = get_extractor_class(agent_name)
-        try:
-            extractor = ExtractorClass.create("__scan__")
-            workspaces = extractor.scan_workspaces()
-            agent_workspaces[agent_name] = workspaces
-        except Exception:
-            agent_workspaces[agent_name] = []
-    
-    all_workspaces = _merge_workspaces(agent_workspaces)
-    all_workspaces.sort(key=lambda x: (x.workspace_name.lower() or x.workspace_id.lower()))
+    all_workspaces = _merge_workspaces(_scan_agent_workspaces())
+    all_workspaces.sort(key=_workspace_sort_key)
     return all_workspaces
 
 
 def list_workspaces_by_page(page: int = 1, page_size: int = 50) -> Tuple[List[WorkspaceInfo], int]:
-    """Get paginated workspaces. Returns (list, total_count)."""
-    all_workspaces = list_all_workspaces()
-    total_count = len(all_workspaces)
+    """Get paginated workspaces. Returns (list, total_count).
+    
+    Pages are defined over the merged, name-sorted listing, so every agent is
+    still scanned; only the first page * page_size entries are ordered
+    instead of sorting the whole listing. Pages below 1 are empty.
+    """
+    merged = _merge_workspaces(_scan_agent_workspaces())
+    total_count = len(merged)
     start_idx = (page - 1) * page_size
     end_idx = start_idx + page_size
-    return all_workspaces[start_idx:end_idx], total_count
+    if page < 1 or page_size < 1 or start_idx >= total_count:
+        return [], total_count
+    head = heapq.nsmallest(end_idx, merged, key=_workspace_sort_key)
+    return head[start_idx:end_idx], total_count
 
 
-def find_workspace(workspace_id: str) -> Optional[WorkspaceInfo]:
-    """Find workspace by ID across all agents. Returns merged info if found.
+def _scan_agent_workspaces() -> Dict[str, List[WorkspaceInfo]]:
+    """Scan every registered agent once and return its workspaces keyed by agent."""
+    all_agent_workspaces: Dict[str, List[WorkspaceInfo]] = {}
+    for agent_name in list_registered_agents():
+        ExtractorClass = get_extractor_class(agent_name)
+        try:
+            extractor = ExtractorClass.create("__scan__")
+            all_agent_workspaces[agent_name] = extractor.scan_workspaces()
+        except Exception:
+            all_agent_workspaces[agent_name] = []
+    return all_agent_workspaces
+
+
+def _resolve_workspace(
+    workspace_id: str,
+    all_agent_workspaces: Dict[str, List[WorkspaceInfo]],
+) -> Optional[WorkspaceInfo]:
+    """Build the merged WorkspaceInfo for workspace_id from pre-scanned agent workspaces.
     
     This searches for:
     1. Exact workspace_id match
@@ -115,27 +135,11 @@ def find_workspace(workspace_id: str) -> Optional[WorkspaceInfo]:
     
     Returns a WorkspaceInfo with an additional _agent_workspace_ids dict that maps
     agent_name -> original_workspace_id for use during extraction.
-    
-    Results are cached to avoid repeated agent scans during extraction pipelines.
     """
-    # Check cache first
-    if workspace_id in _find_workspace_cache:
-        return _find_workspace_cache[workspace_id]
-    
     matches: Dict[str, WorkspaceInfo] = {}
     agent_workspace_ids: Dict[str, str] = {}  # agent -> their workspace_id
     target_folder: Optional[str] = None
     
-    # Single scan: collect all workspaces from all agents once
-    all_agent_workspaces: Dict[str, List[WorkspaceInfo]] = {}
-    for agent_name in list_registered_agents():
-        ExtractorClass = get_extractor_class(agent_name)
-        try:
-            extractor = ExtractorClass.create("__scan__")
-            all_agent_workspaces[agent_name] = extractor.scan_workspaces()
-        except Exception:
-            all_agent_workspaces[agent_name] = []
-    
     # First pass: find exact ID matches
     for agent_name, workspaces in all_agent_workspaces.items():
         for ws in workspaces:
@@ -159,7 +163,6 @@ def find_workspace(workspace_id: str) -> Optional[WorkspaceInfo]:
                         break
     
     if not matches:
-        _find_workspace_cache[workspace_id] = None
         return None
     
     # Build consolidated result
@@ -175,12 +178,41 @@ def find_workspace(workspace_id: str) -> Optional[WorkspaceInfo]:
     )
     # Store the agent-specific IDs for extraction
     result._agent_workspace_ids = agent_workspace_ids  # type: ignore
-    
-    # Cache the result
-    _find_workspace_cache[workspace_id] = result
     return result
 
 
+def find_workspace(workspace_id: str) -> Optional[WorkspaceInfo]:
+    """Find workspace by ID across all agents (see find_workspaces)."""
+    return find_workspaces([workspace_id])[workspace_id]
+
+
+def find_workspaces(workspace_ids: Iterable[str]) -> Dict[str, Optional[WorkspaceInfo]]:
+    """Find several workspaces by ID with at most one scan of agent storage.
+    
+    Each ID is matched by _resolve_workspace; unknown IDs map to None.
+    Results (including misses) are cached until clear_find_workspace_cache()
+    so repeated lookups during extraction pipelines don't rescan agents.
+    """
+    results: Dict[str, Optional[WorkspaceInfo]] = {}
+    pending: List[str] = []
+    for workspace_id in workspace_ids:
+        if workspace_id in _find_workspace_cache:
+            results[workspace_id] = _find_workspace_cache[workspace_id]
+        elif workspace_id not in results:
+            results[workspace_id] = None
+            pending.append(workspace_id)
+    
+    if pending:
+        # Single scan: collect all workspaces from all agents once
+        all_agent_workspaces = _scan_agent_workspaces()
+        for workspace_id in pending:
+            result = _resolve_workspace(workspace_id, all_agent_workspaces)
+            _find_workspace_cache[workspace_id] = result
+            results[workspace_id] = result
+    
+    return results
+
+
 def get_workspace_latest_stats(workspace_id: str) -> Dict[str, Optional[WorkspaceActivity]]:
     """Get latest activity stats from all agents without full extraction."""
     stats = {}
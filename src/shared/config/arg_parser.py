@@ -0,0 +1,42 @@
+"""Argument parser used by the CLI and web entry points.
+
+Every ``add_argument`` call validates the new action by formatting it with a
+freshly built ``HelpFormatter`` (two of them on CPython 3.14, each probing the
+terminal size and colour environment). The parser below reuses a single
+formatter for that read-only validation, mirroring the upstream fix for
+CPython gh-142267. Help output still gets a fresh formatter per call.
+"""
+
+import argparse
+from typing import Any, Optional
+
+
+class FastArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser that caches the formatter used to validate arguments.
+
+    Relies on the private ``_get_formatter`` hook, so it can be removed (and
+    callers switched back to ``argparse.ArgumentParser``) once the minimum
+    supported Python includes the upstream fix.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self._cached_formatter: Optional[argparse.HelpFormatter] = None
+        self._validating = False
+        super().__init__(*args, **kwargs)
+
+    def add_argument(self, *args: Any, **kwargs: Any) -> argparse.Action:
+        self._validating = True
+        try:
+            return super().add_argument(*args, **kwargs)
+        finally:
+            self._validating = False
+
+    def _get_validation_formatter(self) -> argparse.HelpFormatter:
+        if self._cached_formatter is None:
+            self._cached_formatter = super()._get_formatter()
+        return self._cached_formatter
+
+    def _get_formatter(self) -> argparse.HelpFormatter:
+        if self._validating:
+            return self._get_validation_formatter()
+        return super()._get_formatter()
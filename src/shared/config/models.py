@@ -85,6 +85,10 @@ class SearchConfig:
     embedding_batch_size: int = 64
     max_page_size: int = 100
     auto_embed_on_extraction: bool = False
+    semantic_cache_enabled: bool = False
+    semantic_cache_ttl_seconds: float = 300.0
+    semantic_cache_max_entries: int = 256
+    semantic_cache_threshold: float = 0.95
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SearchConfig":
@@ -99,6 +103,10 @@ class SearchConfig:
             embedding_batch_size=int(data.get("embedding_batch_size", 64)),
             max_page_size=int(data.get("max_page_size", 100)),
             auto_embed_on_extraction=bool(data.get("auto_embed_on_extraction", False)),
+            semantic_cache_enabled=bool(data.get("semantic_cache_enabled", False)),
+            semantic_cache_ttl_seconds=float(data.get("semantic_cache_ttl_seconds", 300.0)),
+            semantic_cache_max_entries=int(data.get("semantic_cache_max_entries", 256)),
+            semantic_cache_threshold=float(data.get("semantic_cache_threshold", 0.95)),
         )
 
 
@@ -6,11 +6,16 @@ Provides keyword (FTS5), semantic (embeddings), and hybrid search capabilities.
 
 from __future__ import annotations
 
+import os
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from src.shared.logging.logger import get_logger
 from src.shared.config.config_loader import get_config
+from src.shared.config.models import SearchConfig
+
+if TYPE_CHECKING:
+    from src.shared.search.semantic_cache import SemanticCache
 
 logger = get_logger(__name__)
 
@@ -178,8 +183,12 @@ def _semantic_search_all(
     roles: Optional[List[str]],
     model_name: str,
     min_score: float,
+    query_vec: Optional[Any] = None,
 ) -> List[Dict[str, Any]]:
-    """Execute semantic search using embeddings."""
+    """Execute semantic search using embeddings.
+    
+    query_vec may be passed in when the caller has already embedded the query.
+    """
     import numpy as np
     from src.shared.search.embeddings import deserialize_embedding, embed_texts
 
@@ -205,7 +214,8 @@ def _semantic_search_all(
             raise ValueError("Semantic index not initialized. Run --reindex.") from exc
         raise
 
-    query_vec = embed_texts([query], model_name)[0]
+    if query_vec is None:
+        query_vec = embed_texts([query], model_name)[0]
 
     results: List[Dict[str, Any]] = []
     vectors: List[np.ndarray] = []
@@ -380,6 +390,47 @@ def _keyword_timeline_aggregation(
     }
 
 
+_SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
+_result_cache: Optional["SemanticCache"] = None
+
+
+def _get_result_cache(config: SearchConfig) -> "SemanticCache":
+    """Return the process-wide search result cache, created from config on first use."""
+    global _result_cache
+    if _result_cache is None:
+        from src.shared.search.semantic_cache import SemanticCache
+
+        _result_cache = SemanticCache(
+            max_entries=config.semantic_cache_max_entries,
+            ttl_seconds=config.semantic_cache_ttl_seconds,
+            threshold=config.semantic_cache_threshold,
+        )
+    return _result_cache
+
+
+def clear_search_cache() -> None:
+    """Drop cached search results (e.g. after re-indexing)."""
+    if _result_cache is not None:
+        _result_cache.clear()
+
+
+def _db_identity(conn: sqlite3.Connection) -> Optional[Tuple[str, int, int]]:
+    """Identify the database file and its current version for cache scoping.
+    
+    Returns None for in-memory databases, which are never cached.
+    """
+    row = conn.execute("PRAGMA database_list").fetchone()
+    db_file = row[2] if row else ""
+    if not db_file:
+        return None
+    try:
+        stat = os.stat(db_file)
+    except OSError:
+        return None
+    return (db_file, stat.st_mtime_ns, stat.st_size)
+
+
 def search_turns(
     conn: sqlite3.Connection,
     query: str,
@@ -423,6 +474,42 @@ def search_turns(
     if min_score_value is None:
         min_score_value = config.semantic_strict_min_score if strict else config.semantic_min_score
 
+    cache = _get_result_cache(config) if config.semantic_cache_enabled else None
+    db_identity = _db_identity(conn) if cache is not None else None
+    if cache is None or db_identity is None or mode not in _SEARCH_MODES:
+        return _run_search(conn, query, mode, roles, page, page_size, offset, min_score_value, config)
+
+    scope = (db_identity, mode, tuple(roles or ()), page, page_size, float(min_score_value), config.semantic_model)
+    query_vec = None
+    cached = cache.get(scope, query)
+    if cached is None and mode != "keyword":
+        from src.shared.search.embeddings import embed_texts
+
+        query_vec = embed_texts([query], config.semantic_model)[0]
+        cached = cache.get(scope, query, query_vec)
+    if cached is not None:
+        return {**cached, "query": query}
+
+    result = _run_search(
+        conn, query, mode, roles, page, page_size, offset, min_score_value, config, query_vec
+    )
+    cache.put(scope, query, result, query_vec)
+    return result
+
+
+def _run_search(
+    conn: sqlite3.Connection,
+    query: str,
+    mode: str,
+    roles: Optional[List[str]],
+    page: int,
+    page_size: int,
+    offset: int,
+    min_score_value: float,
+    config: SearchConfig,
+    query_vec: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Run a validated search request against the database (no caching)."""
     if mode == "keyword":
         results, total_count = _keyword_search_page(conn, query, roles, page_size, offset)
         timeline = _keyword_timeline_aggregation(conn, query, roles)
@@ -443,6 +530,7 @@ def search_turns(
             roles,
             config.semantic_model,
             float(min_score_value),
+            query_vec,
         )
         total_count = len(semantic_results)
         timeline = _build_timeline_aggregation(semantic_results)
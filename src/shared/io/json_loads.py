@@ -0,0 +1,15 @@
+"""JSON parsing with an optional fast backend.
+
+Shared by the extractors that parse large agent state and session files.
+Uses orjson when it is installed and falls back to the standard library.
+Both accept str or bytes, and orjson.JSONDecodeError subclasses
+json.JSONDecodeError, so callers catch json.JSONDecodeError for either.
+"""
+import json
+
+try:
+    from orjson import loads
+except ImportError:
+    loads = json.loads
+
+__all__ = ["loads"]
@@ -3,14 +3,19 @@
 Shared utilities used by both Copilot and Cursor extractors.
 """
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from urllib.parse import unquote, urlparse
 
 
+@lru_cache(maxsize=4096)
 def normalize_path(path: str) -> str:
     """Normalize path: backslashes to forward slashes, lowercase drive letter.
     
+    Cached: the same few files recur across the turns of a session, and the
+    result depends only on the path string.
+    
     Examples:
         C:\\Users\\code -> c:/Users/code
         /c:/path -> c:/path
@@ -27,9 +32,13 @@ def normalize_path(path: str) -> str:
     return path
 
 
+@lru_cache(maxsize=4096)
 def decode_file_uri(uri: str) -> str:
     """Convert file URI to plain path.
     
+    Cached: extractors decode the same URI once per edit, and the result
+    depends only on the URI string.
+    
     Examples:
         file:///c%3A/path -> c:/path
         file:///home/user -> /home/user
@@ -0,0 +1,19 @@
+"""Read-only access to the SQLite state databases of VS Code based editors.
+
+Extractors only read these databases, often while the editor has them open.
+Opening with mode=ro never creates a missing file, never takes a write lock,
+and turns any accidental write into an error instead of touching user data.
+"""
+import sqlite3
+from pathlib import Path
+
+
+def connect_readonly(db_path: Path, **kwargs) -> sqlite3.Connection:
+    """Open db_path read-only; raises sqlite3.OperationalError if it cannot be opened.
+
+    Extra keyword arguments (e.g. factory) are passed to sqlite3.connect.
+    """
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, **kwargs)
+
+
+__all__ = ["connect_readonly"]
@@ -32,11 +32,12 @@ def _get_model(model_name: str):
     return _MODEL_CACHE[model_name]
 
 
-def embed_texts(texts: Iterable[str], model_name: str) -> np.ndarray:
+def embed_texts(texts: Iterable[str], model_name: str, batch_size: int = 32) -> np.ndarray:
     """Generate normalized embeddings for a list of texts."""
     model = _get_model(model_name)
     embeddings = model.encode(
         list(texts),
+        batch_size=batch_size,
         convert_to_numpy=True,
         normalize_embeddings=True,
     )
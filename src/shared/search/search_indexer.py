@@ -126,7 +126,7 @@ def backfill_turn_embeddings(
             return 0
 
         texts = [item[1] for item in batch_list]
-        embeddings = embed_texts(texts, model_name)
+        embeddings = embed_texts(texts, model_name, batch_size=batch_size)
         dims = embeddings.shape[1]
         now_iso = datetime.now(timezone.utc).isoformat()
 
@@ -155,29 +155,33 @@ def backfill_turn_embeddings(
             """,
             rows,
         )
-        conn.commit()
         return len(rows)
 
-    for turn_id, content, existing_hash in cursor:
-        total += 1
-        content = content.strip()
-        if not content:
-            skipped += 1
-            continue
-
-        new_hash = text_hash(content)
-        if existing_hash == new_hash:
-            skipped += 1
-            continue
-
-        pending.append((turn_id, content, new_hash))
-        if len(pending) >= batch_size:
+    # Batches are written inside one transaction (committed once at the end,
+    # or on failure so completed batches are kept) instead of a commit per batch.
+    try:
+        for turn_id, content, existing_hash in cursor:
+            total += 1
+            content = content.strip()
+            if not content:
+                skipped += 1
+                continue
+
+            new_hash = text_hash(content)
+            if existing_hash == new_hash:
+                skipped += 1
+                continue
+
+            pending.append((turn_id, content, new_hash))
+            if len(pending) >= batch_size:
+                updated += flush(pending)
+                pending.clear()
+
+        if pending:
             updated += flush(pending)
             pending.clear()
-
-    if pending:
-        updated += flush(pending)
-        pending.clear()
+    finally:
+        conn.commit()
 
     logger.info(
         "Embedding backfill complete: %d total, %d updated, %d skipped",
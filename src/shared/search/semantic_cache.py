@@ -0,0 +1,107 @@
+"""In-process LRU + TTL cache for search results.
+
+Entries are grouped by a scope tuple (database identity, mode, roles, page,
+page size, score threshold, model). A lookup first tries the exact query
+text, then - when a query embedding is available - the most similar cached
+query in the same scope whose cosine similarity reaches the threshold.
+Embeddings are expected to be L2-normalized (as produced by embed_texts), so
+cosine similarity is a dot product.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class _CacheEntry:
+    expires_at: float
+    embedding: Optional[np.ndarray]
+    result: Dict[str, Any]
+
+
+class SemanticCache:
+    """Bounded LRU cache of search results with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[Tuple[Hashable, str], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def get(
+        self,
+        scope: Hashable,
+        query: str,
+        embedding: Optional[np.ndarray] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached result for query in scope, or None on a miss."""
+        key = (scope, self._normalize(query))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                return entry.result
+            if entry is not None:
+                del self._entries[key]
+            if embedding is None:
+                return None
+            return self._get_similar(scope, embedding, now)
+
+    def _get_similar(self, scope: Hashable, embedding: np.ndarray, now: float) -> Optional[Dict[str, Any]]:
+        keys = []
+        vectors = []
+        for key, entry in list(self._entries.items()):
+            if entry.expires_at <= now:
+                del self._entries[key]
+                continue
+            if key[0] == scope and entry.embedding is not None:
+                keys.append(key)
+                vectors.append(entry.embedding)
+        if not vectors:
+            return None
+        scores = np.vstack(vectors) @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        self._entries.move_to_end(keys[best])
+        return self._entries[keys[best]].result
+
+    def put(
+        self,
+        scope: Hashable,
+        query: str,
+        result: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None,
+    ) -> None:
+        """Store result for query in scope, evicting the least recently used entry if full."""
+        key = (scope, self._normalize(query))
+        with self._lock:
+            self._entries[key] = _CacheEntry(
+                expires_at=time.monotonic() + self.ttl_seconds,
+                embedding=embedding,
+                result=result,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,55 @@
+"""Tests for extract plugin auto-discovery.
+
+Tests:
+- All bundled agents are registered with their metadata
+- Registration order follows plugin directory order
+"""
+from src.extract_plugins import agent_registry
+from src.extract_plugins.agent_extractor import AgentExtractor
+
+BUNDLED_AGENTS = {"claude_code", "copilot", "cursor"}
+
+
+def _rediscover():
+    agent_registry._AGENT_REGISTRY.clear()
+    agent_registry._AGENT_METADATA.clear()
+    agent_registry._agents_loaded = False
+    return agent_registry.list_registered_agents()
+
+
+def test_bundled_agents_registered_with_metadata():
+    """Every bundled plugin registers an AgentExtractor and its metadata.json."""
+    agents = _rediscover()
+
+    assert BUNDLED_AGENTS <= set(agents)
+    for agent in BUNDLED_AGENTS:
+        assert issubclass(agent_registry.get_extractor_class(agent), AgentExtractor)
+        metadata = agent_registry.get_agent_metadata(agent)
+        assert metadata and metadata.get("name")
+
+
+def test_registration_is_deterministic():
+    """Concurrent imports do not change the registration order."""
+    assert _rediscover() == _rediscover()
+
+
+def test_agent_icon_path_cached_until_rediscovery(monkeypatch):
+    """Icon lookups hit the filesystem once per agent until agents reload."""
+    _rediscover()
+    agent_registry.get_agent_icon_path.cache_clear()
+
+    calls = []
+    real_scandir = agent_registry.os.scandir
+    monkeypatch.setattr(agent_registry.os, "scandir", lambda p: calls.append(p) or real_scandir(p))
+
+    icon = agent_registry.get_agent_icon_path("copilot")
+    assert icon is not None and icon.name == "icon.png"
+    assert agent_registry.get_agent_icon_path("copilot") == icon
+    assert len(calls) == 1
+
+    assert agent_registry.get_agent_icon_path("not-an-agent") is None
+
+    _rediscover()
+    calls.clear()
+    assert agent_registry.get_agent_icon_path("copilot") == icon
+    assert len(calls) == 1
@@ -0,0 +1,320 @@
+"""Tests for the Claude Code extractor.
+
+Tests:
+- Project paths are encoded the way Claude Code names its project folders
+- User text is cleaned of control chars, Caveat prefixes and command output
+- Subagent prompts following a "Create a Task" command are filtered
+- history.jsonl is parsed once across scan and extract until it changes
+- Malformed JSONL lines are skipped with orjson and with the stdlib parser
+- Session content probing stops at the first chat message
+- scan_workspaces counts only sessions with chat content across workspaces
+- Subset sessions are skipped; equal and unrelated sessions are kept
+- Subset detection stays exact past 64 distinct user messages
+- extract_sessions drops checkpoint sessions and converts the rest
+- Write and Edit tool calls become code edits on the assistant turn
+- The fast ISO timestamp path matches datetime.fromisoformat
+- scan_workspaces does not stat a path per history entry
+- Consecutive assistant messages aggregate into one turn with unique tools/files
+"""
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+from src.extract_plugins.claude_code import extractor as claude_extractor
+from src.extract_plugins.claude_code.extractor import ClaudeCodeExtractor
+
+CAVEAT = (
+    "Caveat: The messages below were generated by the user while running local commands. "
+    "DO NOT respond to these messages or otherwise consider them in your response unless "
+    "the user explicitly asks you to. "
+)
+
+
+def _msg(role, content, ts, **extra):
+    return {"type": role, "timestamp": ts, "message": {"content": content}, **extra}
+
+
+def _write_jsonl(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(json.dumps(e) for e in entries) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def make_extractor(tmp_path, monkeypatch):
+    """Build extractors reading from a temporary ~/.claude directory."""
+    claude_dir = tmp_path / ".claude"
+    monkeypatch.setattr(ClaudeCodeExtractor, "_load_config", lambda self: {"claude_dir": str(claude_dir)})
+    claude_extractor.clear_history_map_cache()
+
+    def _make(workspace_id="scan"):
+        return ClaudeCodeExtractor(workspace_id)
+
+    _make.claude_dir = claude_dir
+    return _make
+
+
+@pytest.mark.parametrize("project_path, encoded", [
+    ("C:\\code\\my.app", "C--code-my-app"),
+    ("/home/me/.config/app", "-home-me--config-app"),
+    ("", ""),
+])
+def test_encode_project_path(project_path, encoded):
+    """Colons, slashes, backslashes and dots all become dashes."""
+    assert claude_extractor.encode_project_path(project_path) == encoded
+
+
+def test_user_text_is_cleaned(make_extractor):
+    """Control chars, the Caveat prefix and local command output are stripped."""
+    messages = [
+        _msg("user", CAVEAT + "fix\x08 the <local-command-stdout>ok</local-command-stdout> bug", "2025-01-01T00:00:00.000Z"),
+        _msg("assistant", [{"type": "text", "text": "Done"}], "2025-01-01T00:00:01.000Z"),
+    ]
+
+    turns = make_extractor()._convert_session("s1", messages, "-code-app", "/code/app")
+
+    assert [t.role for t in turns] == ["user", "assistant"]
+    assert turns[0].original_text == "fix the bug"
+    assert turns[0].timestamp_ms == 1735689600000
+
+
+def test_subagent_prompt_is_filtered(make_extractor):
+    """The prompt echoed to a subagent after a Task command is not a user turn."""
+    messages = [
+        _msg("user", "real question", "2025-01-01T00:00:00.000Z"),
+        _msg("assistant", [{"type": "text", "text": "answer"}], "2025-01-01T00:00:01.000Z"),
+        _msg("user", 'Create a Task with subagent_type explore and the prompt "look around"', "2025-01-01T00:00:02.000Z"),
+        _msg("user", "look around", "2025-01-01T00:00:03.000Z"),
+    ]
+
+    turns = make_extractor()._convert_session("s1", messages, "-code-app", "/code/app")
+
+    assert [t.original_text for t in turns] == ["real question", "answer"]
+
+
+def test_history_parsed_once_for_scan_and_extract(make_extractor, monkeypatch):
+    """Separate scan and extract extractors share one parse of history.jsonl."""
+    claude_dir = make_extractor.claude_dir
+    history = claude_dir / "history.jsonl"
+    _write_jsonl(history, [{"project": "/code/app"}, {"project": "/code/gone"}])
+    _write_jsonl(claude_dir / "projects" / "-code-app" / "s1.jsonl", [
+        _msg("user", "hello", "2025-01-01T00:00:00.000Z"),
+        _msg("assistant", [{"type": "text", "text": "hi"}], "2025-01-01T00:00:01.000Z"),
+    ])
+    history_opens = []
+
+    def spy_open(path, *args, **kwargs):
+        if path == history:
+            history_opens.append(path)
+        return open(path, *args, **kwargs)
+
+    monkeypatch.setattr(claude_extractor, "open", spy_open, raising=False)
+
+    workspaces = make_extractor().scan_workspaces()
+    extracted = make_extractor("-code-app").extract_sessions()
+
+    assert [(w.workspace_id, w.workspace_folder) for w in workspaces] == [("-code-app", "/code/app")]
+    assert [t.workspace_folder for t in extracted.turns] == ["/code/app", "/code/app"]
+    assert len(history_opens) == 1
+
+    _write_jsonl(history, [{"project": "/code/app.v2"}])
+    assert claude_extractor.load_history_map(history) == {"-code-app-v2": "/code/app.v2"}
+    assert len(history_opens) == 2
+
+
+@pytest.mark.parametrize("loads", [claude_extractor._json_loads, json.loads], ids=["default", "stdlib"])
+def test_malformed_lines_are_skipped(make_extractor, monkeypatch, loads):
+    """A truncated line does not drop the rest of the session."""
+    monkeypatch.setattr(claude_extractor, "_json_loads", loads)
+    claude_dir = make_extractor.claude_dir
+    _write_jsonl(claude_dir / "history.jsonl", [{"project": "/code/app"}])
+    session = claude_dir / "projects" / "-code-app" / "s1.jsonl"
+    _write_jsonl(session, [_msg("user", "hello", "2025-01-01T00:00:00.000Z")])
+    with open(session, "a", encoding="utf-8") as f:
+        f.write('{"type": "assistant", "mess\n')
+        f.write(json.dumps(_msg("assistant", [{"type": "text", "text": "hi"}], "2025-01-01T00:00:01.000Z")) + "\n")
+
+    assert make_extractor()._session_has_content(session)
+    extracted = make_extractor("-code-app").extract_sessions()
+
+    assert [t.original_text for t in extracted.turns] == ["hello", "hi"]
+
+
+def test_session_has_content_stops_at_first_chat_message(make_extractor, tmp_path):
+    """Only the lines up to the first user/assistant message are parsed."""
+    ext = make_extractor()
+    session = tmp_path / "s1.jsonl"
+    _write_jsonl(session, [{"type": "file-history-snapshot"}, _msg("user", "hello", "")])
+    with open(session, "ab") as f:
+        f.write(b"\xff\xfe not json, not utf-8\n")
+    snapshot_only = tmp_path / "s2.jsonl"
+    _write_jsonl(snapshot_only, [{"type": "file-history-snapshot"}, {"type": "system"}])
+
+    assert ext._session_has_content(session)
+    assert not ext._session_has_content(snapshot_only)
+    assert not ext._session_has_content(tmp_path / "missing.jsonl")
+
+
+def test_scan_counts_sessions_with_content(make_extractor):
+    """Snapshot-only sessions and non-session entries are not counted; chatless workspaces are skipped."""
+    claude_dir = make_extractor.claude_dir
+    projects = claude_dir / "projects"
+    _write_jsonl(claude_dir / "history.jsonl", [{"project": p} for p in ("/code/app", "/code/lib", "/code/empty")])
+    chat = [_msg("user", "hello", "2025-01-01T00:00:00.000Z")]
+    snapshot = [{"type": "file-history-snapshot"}]
+    _write_jsonl(projects / "-code-app" / "a1.jsonl", chat)
+    _write_jsonl(projects / "-code-app" / "a2.jsonl", chat)
+    _write_jsonl(projects / "-code-app" / "a3.jsonl", snapshot)
+    _write_jsonl(projects / "-code-lib" / "l1.jsonl", chat)
+    _write_jsonl(projects / "-code-empty" / "e1.jsonl", snapshot)
+    (projects / "-code-lib" / "notes.txt").write_text("hello", encoding="utf-8")
+    (projects / "-code-lib" / "dir.jsonl").mkdir()
+
+    counts = {w.workspace_id: w.session_count for w in make_extractor().scan_workspaces()}
+
+    assert counts == {"-code-app": 2, "-code-lib": 1}
+
+
+def test_find_subset_sessions(make_extractor):
+    """Empty and strict-subset sessions are skipped; duplicates and unrelated ones kept."""
+    a, b, c, d = ("t1", "a"), ("t2", "b"), ("t3", "c"), ("t4", "d")
+    fingerprints = {
+        "small": {a},
+        "middle": {a, b},
+        "full": {a, b, c},
+        "copy1": {d},
+        "copy2": {d},
+        "empty": set(),
+    }
+
+    skipped = make_extractor()._find_subset_sessions(fingerprints)
+
+    assert skipped == {"small", "middle", "empty"}
+
+
+def test_find_subset_sessions_matches_pairwise_check(make_extractor):
+    """Skipped sessions are exactly the empty ones and strict subsets of another."""
+    rng = random.Random(7)
+    universe = [(f"t{i}", f"m{i}") for i in range(12)]
+    fingerprints = {f"s{i}": set(rng.sample(universe, rng.randint(0, 6))) for i in range(40)}
+
+    expected = {
+        sid for sid, fp in fingerprints.items()
+        if not fp or any(fp < other for other in fingerprints.values())
+    }
+
+    assert make_extractor()._find_subset_sessions(fingerprints) == expected
+
+
+def test_find_subset_sessions_beyond_64_elements(make_extractor):
+    """Bitmask subset tests are exact for workspaces with many distinct messages."""
+    elements = [(f"t{i}", f"m{i}") for i in range(200)]
+    fingerprints = {
+        "head": set(elements[:150]),
+        "all": set(elements),
+        "tail": set(elements[100:]) | {("other", "x")},
+    }
+
+    assert make_extractor()._find_subset_sessions(fingerprints) == {"head"}
+
+
+def test_extract_skips_checkpoint_session(make_extractor):
+    """A session whose user messages all appear in another session is not extracted."""
+    claude_dir = make_extractor.claude_dir
+    ws_dir = claude_dir / "projects" / "-code-app"
+    _write_jsonl(claude_dir / "history.jsonl", [{"project": "/code/app"}])
+    first = [
+        _msg("user", "one", "2025-01-01T00:00:00.000Z"),
+        _msg("assistant", [{"type": "text", "text": "reply one"}], "2025-01-01T00:00:01.000Z"),
+    ]
+    second = [
+        _msg("user", "two", "2025-01-01T00:00:02.000Z"),
+        _msg("assistant", [{"type": "text", "text": "reply two"}], "2025-01-01T00:00:03.000Z"),
+    ]
+    _write_jsonl(ws_dir / "checkpoint.jsonl", first)
+    _write_jsonl(ws_dir / "full.jsonl", first + second)
+    _write_jsonl(ws_dir / "other.jsonl", [_msg("user", "unrelated", "2025-01-02T00:00:00.000Z")])
+
+    extracted = make_extractor("-code-app").extract_sessions()
+
+    assert extracted.session_count == 2
+    assert [(t.session_id, t.original_text) for t in extracted.turns] == [
+        ("full", "one"), ("full", "reply one"), ("full", "two"), ("full", "reply two"), ("other", "unrelated"),
+    ]
+
+
+def test_write_and_edit_tools_become_code_edits(make_extractor):
+    """Edit keeps old/new strings as before/after without materializing a diff."""
+    messages = [
+        _msg("user", "rename it", "2025-01-01T00:00:00.000Z"),
+        _msg("assistant", [
+            {"type": "tool_use", "name": "Write", "input": {"file_path": "/code/app/new.py", "content": "x = 1\n"}},
+            {"type": "tool_use", "name": "Edit", "input": {
+                "file_path": "/code/app/main.py", "old_string": "foo", "new_string": "bar",
+            }},
+        ], "2025-01-01T00:00:01.000Z"),
+    ]
+
+    turns = make_extractor()._convert_session("s1", messages, "-code-app", "/code/app")
+
+    write, edit = turns[1].code_edits
+    assert turns[1].tools == ["Edit", "Write"]
+    assert (write.language, write.code_before, write.code_after) == ("python", None, "x = 1\n")
+    assert (edit.code_before, edit.code_after, edit.diff) == ("foo", "bar", None)
+    assert edit.extra == {"tool": "Edit"}
+
+
+@pytest.mark.parametrize("ts_iso", [
+    "2025-01-01T00:00:00.000Z",
+    "2025-06-15T13:45:07.123Z",
+    "2024-02-29T23:59:59.999Z",
+    "2025-01-31T10:00:00Z",
+    "1969-12-31T23:59:59.999Z",
+    "2025-01-01T00:00:00.123456+00:00",
+    "2025-02-30T00:00:00.000Z",
+    "2025-13-01T00:00:00.000Z",
+    "not-a-timestamp-at-all-Z",
+])
+def test_iso_to_ms_matches_datetime(ts_iso):
+    """Sliced parsing agrees with datetime, including rounding and invalid dates."""
+    try:
+        expected = int(datetime.fromisoformat(ts_iso.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        expected = 0
+
+    assert claude_extractor._iso_to_ms(ts_iso) == expected
+
+
+def test_scan_lists_projects_dir_once(make_extractor, monkeypatch):
+    """History entries without a project directory cost no filesystem calls."""
+    claude_dir = make_extractor.claude_dir
+    _write_jsonl(claude_dir / "history.jsonl", [{"project": f"/code/gone{i}"} for i in range(50)] + [{"project": "/code/app"}])
+    _write_jsonl(claude_dir / "projects" / "-code-app" / "s1.jsonl", [_msg("user", "hello", "")])
+    path_checks = []
+    for name in ("exists", "is_dir"):
+        real = getattr(claude_extractor.Path, name)
+        monkeypatch.setattr(claude_extractor.Path, name, lambda self, _real=real: path_checks.append(self) or _real(self))
+
+    workspaces = make_extractor().scan_workspaces()
+
+    assert [w.workspace_id for w in workspaces] == ["-code-app"]
+    assert path_checks == [claude_dir / "history.jsonl"]
+
+
+def test_aggregated_tools_and_files_are_unique_and_sorted(make_extractor):
+    """Repeated tool calls on the same file collapse into one sorted entry each."""
+    def read(path):
+        return {"type": "tool_use", "name": "Read", "input": {"file_path": path}}
+
+    messages = [
+        _msg("user", "look", "2025-01-01T00:00:00.000Z"),
+        _msg("assistant", [read("/code/app/b.py"), read("/code/app/a.py")], "2025-01-01T00:00:01.000Z"),
+        _msg("assistant", [read("/code/app/b.py"), {"type": "tool_use", "name": "Bash", "input": {}}], "2025-01-01T00:00:02.000Z"),
+    ]
+
+    turns = make_extractor()._convert_session("s1", messages, "-code-app", "/code/app")
+
+    assert len(turns) == 2
+    assert turns[1].tools == ["Bash", "Read"]
+    assert turns[1].files == ["/code/app/a.py", "/code/app/b.py"]
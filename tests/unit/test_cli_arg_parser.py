@@ -0,0 +1,95 @@
+"""Tests for the cached-formatter argument parser used by the CLI entry points.
+
+Tests:
+- Validation formatter is built once and reused across add_argument calls
+- --help still builds a fresh formatter and output is unchanged
+- metavar/nargs mismatches are still rejected
+"""
+import argparse
+import sys
+
+import pytest
+
+import run_cli
+import run_web
+from src.shared.config.arg_parser import FastArgumentParser
+
+
+@pytest.fixture
+def formatter_counter(monkeypatch):
+    """Count formatters built by the stock ArgumentParser._get_formatter."""
+    created = []
+    original = argparse.ArgumentParser._get_formatter
+
+    def counting(self):
+        formatter = original(self)
+        created.append(formatter)
+        return formatter
+
+    monkeypatch.setattr(argparse.ArgumentParser, "_get_formatter", counting)
+    return created
+
+
+def test_validation_formatter_reused_across_add_argument(formatter_counter):
+    """Building a parser with many options creates a single formatter."""
+    parser = FastArgumentParser(prog="test")
+    for i in range(10):
+        parser.add_argument(f"--opt-{i}", nargs=2, metavar=("A", "B"))
+
+    assert len(formatter_counter) == 1
+    assert parser._cached_formatter is formatter_counter[0]
+
+
+def test_cli_parser_builds_one_formatter(formatter_counter):
+    """run_cli.parse_args validates all of its options with one formatter."""
+    run_cli.parse_args([])
+
+    assert len(formatter_counter) == 1
+
+
+def test_help_uses_fresh_formatter(formatter_counter):
+    """format_help() never hands out the cached validation formatter."""
+    parser = FastArgumentParser(prog="test")
+    parser.add_argument("--name")
+    cached = parser._cached_formatter
+
+    first = parser.format_help()
+    second = parser.format_help()
+
+    assert first == second
+    assert len(formatter_counter) == 3
+    assert all(f is not cached for f in formatter_counter[1:])
+
+
+def test_metavar_nargs_mismatch_still_raises():
+    """Validation still runs with the cached formatter."""
+    parser = FastArgumentParser(prog="test")
+    with pytest.raises(ValueError):
+        parser.add_argument("--pair", nargs=2, metavar=("A", "B", "C"))
+
+
+def _capture_help(capsys, run) -> str:
+    with pytest.raises(SystemExit):
+        run()
+    return capsys.readouterr().out
+
+
+def test_run_cli_help_unchanged(monkeypatch, capsys):
+    """--help output matches the stock ArgumentParser."""
+    fast = _capture_help(capsys, lambda: run_cli.parse_args(["--help"]))
+    monkeypatch.setattr(run_cli, "FastArgumentParser", argparse.ArgumentParser)
+    stock = _capture_help(capsys, lambda: run_cli.parse_args(["--help"]))
+
+    assert fast == stock
+    assert "--list-workspaces" in fast
+
+
+def test_run_web_help_unchanged(monkeypatch, capsys):
+    """run_web --help output matches the stock ArgumentParser."""
+    monkeypatch.setattr(sys, "argv", ["run_web.py", "--help"])
+    fast = _capture_help(capsys, run_web.main)
+    monkeypatch.setattr(run_web, "FastArgumentParser", argparse.ArgumentParser)
+    stock = _capture_help(capsys, run_web.main)
+
+    assert fast == stock
+    assert "--port" in fast
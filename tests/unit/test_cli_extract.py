@@ -43,6 +43,27 @@ def test_extract_single_workspace_creates_database(cli_runner, make_test_config,
     assert ws_row[0] == workspace_id
 
 
+
+def test_extract_reports_unknown_workspace_ids(cli_runner, make_test_config, copilot_workspace, run_dir):
+    """Unknown IDs are reported while valid IDs are still extracted."""
+    config_path = make_test_config(copilot_storage=copilot_workspace["storage_root"])
+    
+    workspace_id = copilot_workspace["workspace_id"]
+    result = cli_runner(
+        "--extract", workspace_id, "no-such-workspace", "--run-dir", str(run_dir),
+        config_path=config_path,
+    )
+    
+    assert result.returncode == 0, f"Extraction failed: {result.stderr}"
+    assert "[WARN] Workspace(s) not found: no-such-workspace" in result.stdout
+    
+    conn = sqlite3.connect(str(get_test_db_path(run_dir)))
+    cursor = conn.execute("SELECT COUNT(*) FROM turns WHERE workspace_id = ?", (workspace_id,))
+    turn_count = cursor.fetchone()[0]
+    conn.close()
+    
+    assert turn_count > 0, "Valid workspace was not extracted"
+
 def test_extract_all_workspaces(cli_runner, make_test_config, copilot_workspace, cursor_workspace, run_dir):
     """T1-5: Verify --all extracts multiple workspaces."""
     config_path = make_test_config(
@@ -70,3 +70,20 @@ def test_list_workspaces_empty_state(cli_runner, make_test_config):
     assert isinstance(data["workspaces"], list)
     assert len(data["workspaces"]) == 0
 
+
+
+def test_list_workspaces_page_arguments(cli_runner, make_test_config, copilot_workspace):
+    """--list PAGE SIZE is parsed as integers; non-integers are rejected."""
+    config_path = make_test_config(
+        copilot_storage=copilot_workspace["storage_root"]
+    )
+    
+    result = cli_runner("--list", "1", "5", "--json", config_path=config_path)
+    assert result.returncode == 0, f"CLI failed: {result.stderr}"
+    data = json.loads(result.stdout)
+    assert data["page"] == 1
+    assert data["page_size"] == 5
+    
+    result = cli_runner("--list", "abc", config_path=config_path)
+    assert result.returncode == 2
+    assert "invalid int value" in result.stderr
@@ -105,3 +105,44 @@ def test_search_json_output(cli_runner, make_test_config, copilot_workspace, run
     data = _extract_json_from_output(result.stdout)
     assert "results" in data
     assert isinstance(data["results"], list)
+
+
+def test_search_compact_json_output(cli_runner, make_test_config, copilot_workspace, run_dir):
+    """Verify --search --json --compact prints single-line JSON."""
+    config_path = make_test_config(copilot_storage=copilot_workspace["storage_root"])
+    
+    workspace_id = copilot_workspace["workspace_id"]
+    cli_runner("--extract", workspace_id, "--run-dir", str(run_dir), config_path=config_path)
+    cli_runner("--reindex", "--run-dir", str(run_dir), config_path=config_path)
+    
+    result = cli_runner(
+        "--search", "test", "--json", "--compact", "--run-dir", str(run_dir),
+        config_path=config_path,
+    )
+    
+    assert result.returncode == 0, f"Search failed: {result.stderr}"
+    json_lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    assert len(json_lines) == 1
+    assert "results" in json.loads(json_lines[0])
+
+
+def test_format_search_results_single_emit(monkeypatch):
+    """Search results for a page are emitted in one logger call."""
+    import run_cli
+    
+    emitted = []
+    monkeypatch.setattr(run_cli.logger, "progress", lambda msg, *a, **k: emitted.append(msg))
+    rows = [
+        {"role": "user", "score": 0.5, "turn": 1, "session_id": "s1", "original_text": "line one\nline two"},
+        {"role": None, "score": 0.25, "turn": 2, "session_id": "s2", "original_text": "x" * 200},
+    ]
+    
+    run_cli._format_search_results(rows, total_count=12, page=2, page_size=10)
+    
+    assert len(emitted) == 1
+    lines = emitted[0].split("\n")
+    assert lines[1] == "Search results (page 2, showing 2 of 12):"
+    assert lines[3] == "  11. [user] score=0.500 turn=1 session=s1"
+    assert lines[4] == "      line one line two"
+    assert lines[5].startswith("  12. [unknown]")
+    assert lines[6] == "      " + "x" * 160 + "..."
@@ -0,0 +1,151 @@
+"""Tests for Copilot chatEditingSessions edit extraction.
+
+Tests:
+- fileBaselines produce one edit per changed request step
+- Each content hash is read once per session folder
+- Baselines listed out of epoch order are diffed in epoch order per file
+- Steps whose before and after hashes match are skipped without reading content
+- recentSnapshot and linearHistory fallbacks produce edits
+- Missing, malformed or non-UTF-8 state.json yields no edits
+- state.json without any edit source key is not parsed
+"""
+import json
+
+from src.extract_plugins.copilot import edits as copilot_edits
+
+FILE_URI = "file:///code/app/hello.py"
+
+
+def _write_state(folder, state, contents=None):
+    contents_dir = folder / "contents"
+    contents_dir.mkdir(parents=True, exist_ok=True)
+    for content_hash, text in (contents or {}).items():
+        (contents_dir / content_hash).write_text(text, encoding="utf-8")
+    (folder / "state.json").write_text(json.dumps(state), encoding="utf-8")
+    return folder
+
+
+def test_baselines_produce_edit_per_request(copilot_workspace_with_edits):
+    """Each baseline step diffs against the next step, the last one against the snapshot."""
+    session_folder = copilot_workspace_with_edits["path"] / "chatEditingSessions" / "edit-session-123"
+
+    edits = copilot_edits.extract_edits(session_folder)
+
+    assert [e.extra["request_id"] for e in edits] == ["req-edit-001", "req-edit-002"]
+    assert edits[0].code_before == ""
+    assert edits[0].code_after == edits[1].code_before
+    assert "test_hello" in edits[1].code_after
+    assert all(e.file_path.endswith("/hello.py") and e.language == "py" for e in edits)
+
+
+def test_content_hash_read_once(copilot_workspace_with_edits, monkeypatch):
+    """The hash shared by consecutive baseline steps is read from disk only once."""
+    session_folder = copilot_workspace_with_edits["path"] / "chatEditingSessions" / "edit-session-123"
+    reads = []
+    real_read = copilot_edits._read_content
+    monkeypatch.setattr(copilot_edits, "_read_content", lambda h, d: reads.append(h) or real_read(h, d))
+
+    edits = copilot_edits.extract_edits(session_folder)
+
+    assert len(edits) == 2
+    assert len(reads) == len(set(reads)) == 3
+
+
+def test_baselines_ordered_by_epoch(tmp_path):
+    """Steps are paired by epoch regardless of their order in fileBaselines."""
+    other_uri = "file:///code/app/other.py"
+    folder = _write_state(tmp_path / "s1", {
+        "timeline": {"fileBaselines": [
+            [f"{FILE_URI}::req-2", {"requestId": "req-2", "epoch": 2, "content": "h2"}],
+            [f"{other_uri}::req-2", {"requestId": "req-2", "epoch": 2, "content": "o1"}],
+            [f"{FILE_URI}::req-1", {"requestId": "req-1", "epoch": 1, "content": "h1"}],
+        ]},
+        "recentSnapshot": {"entries": [
+            {"resource": FILE_URI, "currentHash": "h3"},
+            {"resource": other_uri, "currentHash": "o2"},
+        ]},
+    }, {"h1": "1\n", "h2": "2\n", "h3": "3\n", "o1": "a\n", "o2": "b\n"})
+
+    edits = copilot_edits.extract_edits(folder)
+
+    assert sorted((e.file_path, e.extra["request_id"], e.code_before, e.code_after) for e in edits) == [
+        ("/code/app/hello.py", "req-1", "1\n", "2\n"),
+        ("/code/app/hello.py", "req-2", "2\n", "3\n"),
+        ("/code/app/other.py", "req-2", "a\n", "b\n"),
+    ]
+
+
+def test_unchanged_baseline_step_not_read(tmp_path, monkeypatch):
+    """A step whose hash equals the next one produces no edit and reads no content."""
+    folder = _write_state(tmp_path / "s1", {
+        "initialFileContents": [[FILE_URI, "h1"]],
+        "timeline": {"fileBaselines": [
+            [f"{FILE_URI}::req-1", {"requestId": "req-1", "epoch": 1, "content": "h1"}],
+            [f"{FILE_URI}::req-2", {"requestId": "req-2", "epoch": 2, "content": "h1"}],
+        ]},
+        "recentSnapshot": {"entries": [{"resource": FILE_URI, "currentHash": "h1"}]},
+    }, {"h1": "1\n"})
+    reads = []
+    real_read = copilot_edits._read_content
+    monkeypatch.setattr(copilot_edits, "_read_content", lambda h, d: reads.append(h) or real_read(h, d))
+
+    assert copilot_edits.extract_edits(folder) == []
+    assert reads == []
+
+
+def test_snapshot_fallback(tmp_path):
+    """Without baselines, initial contents are diffed against the recent snapshot."""
+    folder = _write_state(tmp_path / "s1", {
+        "initialFileContents": [[FILE_URI, "h-before"]],
+        "recentSnapshot": {"entries": [
+            {"resource": FILE_URI, "currentHash": "h-after", "telemetryInfo": "@{requestId=req-9; agentId=x}"},
+        ]},
+    }, {"h-before": "a = 1\n", "h-after": "a = 2\n"})
+
+    edits = copilot_edits.extract_edits(folder)
+
+    assert [(e.file_path, e.code_before, e.code_after, e.extra["request_id"]) for e in edits] == [
+        ("/code/app/hello.py", "a = 1\n", "a = 2\n", "req-9"),
+    ]
+
+
+def test_linear_history_fallback(tmp_path):
+    """linearHistory stops are used when neither baselines nor snapshot yield edits."""
+    folder = _write_state(tmp_path / "s1", {
+        "linearHistory": [{"requestId": "req-1", "stops": [{"entries": [
+            {"resource": FILE_URI, "originalHash": "h-before", "currentHash": "h-after"},
+            {"resource": FILE_URI, "originalHash": "h-same", "currentHash": "h-same"},
+        ]}]}],
+    }, {"h-before": "x\n", "h-after": "y\n"})
+
+    edits = copilot_edits.extract_edits(folder)
+
+    assert [(e.code_before, e.code_after, e.extra["request_id"]) for e in edits] == [("x\n", "y\n", "req-1")]
+
+
+def test_missing_or_malformed_state(tmp_path):
+    """No state.json, or one that is not valid JSON or UTF-8, yields no edits."""
+    missing = tmp_path / "missing"
+    missing.mkdir()
+    malformed = tmp_path / "malformed"
+    malformed.mkdir()
+    (malformed / "state.json").write_text("{not json", encoding="utf-8")
+    binary = tmp_path / "binary"
+    binary.mkdir()
+    (binary / "state.json").write_bytes(b'{"a": "\xff\xfe"}')
+
+    assert copilot_edits.extract_edits(missing) == []
+    assert copilot_edits.extract_edits(malformed) == []
+    assert copilot_edits.extract_edits(binary) == []
+
+
+def test_state_without_edit_sources_not_parsed(tmp_path, monkeypatch):
+    """A state.json with none of the edit source keys is skipped before JSON parsing."""
+    folder = _write_state(tmp_path / "s1", {"initialFileContents": [[FILE_URI, "h1"]], "version": 1})
+
+    def fail(_raw):
+        raise AssertionError("state.json was parsed")
+
+    monkeypatch.setattr(copilot_edits, "_json_loads", fail)
+
+    assert copilot_edits.extract_edits(folder) == []
@@ -0,0 +1,226 @@
+"""Tests for the Copilot agent extractor adapter.
+
+Tests:
+- get_latest_activity counts '"role"' markers across session files, including empty ones
+- scan_workspaces counts only *.json session files
+- Sessions, workspace.json and titles parse; malformed or non-UTF-8 sessions yield no turns
+- Sessions whose head shows an empty requests list are detected without decoding
+- extract_session falls back to the caller's stat for request timestamps
+- _find_fields resolves each name set as an independent search would
+- Session titles load read-only, including from paths that need URI escaping
+- discover_workspaces keeps folder order and skips folders without real sessions
+- Short fence lines are held until a code block starts; longer ones are plain text
+- Inline references resolve to a symbol name or a file name
+- Code edits attach to the assistant turn with the matching request id
+- Response time comes from result.timings.totalElapsed, else 0
+"""
+import json
+import os
+import sqlite3
+
+import pytest
+
+from src.extract_plugins.copilot import extractor as copilot_extractor
+from src.extract_plugins.copilot.agent import CopilotExtractor
+from src.extract_plugins.copilot.extractor import WorkspaceMeta
+
+
+@pytest.fixture
+def make_extractor(monkeypatch):
+    """Build a CopilotExtractor over a workspace folder without reading config.yaml."""
+    monkeypatch.setattr(CopilotExtractor, "_load_config", lambda self: {})
+
+    def _make(ws_path):
+        meta = WorkspaceMeta(
+            workspace_id=ws_path.name, workspace_name=ws_path.name,
+            workspace_folder=str(ws_path), path=ws_path, titles={},
+        )
+        return CopilotExtractor.create(ws_path.name, workspace_meta=meta)
+
+    return _make
+
+
+def test_latest_activity_counts_roles(tmp_path, make_extractor):
+    """Turn count is the number of '"role"' markers; empty session files count as sessions with no turns."""
+    chat_dir = tmp_path / "ws-1" / "chatSessions"
+    chat_dir.mkdir(parents=True)
+    texts = {
+        "a": '{"requests": [{"role": "user"}, {"role": "assistant"}, {"x": "\\"role\\""}]}',
+        "b": '"role""role"',
+        "empty": "",
+    }
+    for name, text in texts.items():
+        (chat_dir / f"{name}.json").write_text(text, encoding="utf-8")
+
+    activity = make_extractor(tmp_path / "ws-1").get_latest_activity()
+
+    assert sorted(activity.session_ids) == ["a", "b", "empty"]
+    assert activity.session_count == 3
+    assert activity.turn_count == sum(t.count('"role"') for t in texts.values())
+
+
+def test_scan_counts_json_session_files(copilot_workspace, monkeypatch):
+    """Other files and directories in chatSessions are not counted as sessions."""
+    monkeypatch.setattr(
+        CopilotExtractor, "_load_config",
+        lambda self: {"workspace_storage": str(copilot_workspace["storage_root"])},
+    )
+    chat_dir = copilot_workspace["path"] / "chatSessions"
+    (chat_dir / "notes.txt").write_text("{}", encoding="utf-8")
+    (chat_dir / "folder.json").mkdir()
+
+    [info] = CopilotExtractor("").scan_workspaces()
+
+    assert info.workspace_id == copilot_workspace["workspace_id"]
+    assert info.session_count == 1
+
+
+def test_extract_workspace_parses_sessions(copilot_workspace):
+    """Turns carry the session title from state.vscdb and the folder from workspace.json."""
+    chat_dir = copilot_workspace["path"] / "chatSessions"
+    (chat_dir / "broken.json").write_text('{"requests": [', encoding="utf-8")
+    (chat_dir / "binary.json").write_bytes(b'{"requests": [{"message": "\xff"}]}')
+
+    [meta] = copilot_extractor.discover_workspaces(copilot_workspace["storage_root"])
+    turns = copilot_extractor.extract_workspace(meta)
+
+    assert meta.workspace_folder.endswith("my-test-project")
+    assert [(t.session_id, t.role) for t in turns] == [("session-abc-123", "user"), ("session-abc-123", "assistant")] * 2
+    assert {t.session_name for t in turns} == {"Test Session Title"}
+    assert turns[0].request_id == "req-001"
+
+
+@pytest.mark.parametrize("content, expected", [
+    (b'{"version": 3, "requests": []}', True),
+    (b'{"version":3,"requests":[]}', True),
+    (b'{"requests": [{"message": "\xc3\xa9"}]}', False),
+    (b'\xff\xfe{"requests": []}', True),
+])
+def test_is_empty_session(tmp_path, content, expected):
+    """The empty-requests marker is found in the raw head bytes, whatever the encoding of the rest."""
+    path = tmp_path / "s.json"
+    path.write_bytes(content)
+
+    assert copilot_extractor._is_empty_session(path) is expected
+    assert copilot_extractor._is_empty_session(tmp_path / "missing.json") is True
+
+
+def test_extract_session_uses_given_stat(tmp_path):
+    """Requests without timestamps take the mtime from the stat the caller passes in."""
+    session = tmp_path / "s.json"
+    session.write_text('{"requests": [{"requestId": "r1", "message": {"text": "hi"}}]}', encoding="utf-8")
+    other = tmp_path / "other"
+    other.write_text("", encoding="utf-8")
+    os.utime(other, (1_700_000_000, 1_700_000_000))
+    meta = WorkspaceMeta(workspace_id="ws", workspace_name="ws", workspace_folder="", path=tmp_path, titles={})
+
+    turns = copilot_extractor.extract_session(session, meta, other.stat())
+
+    assert [t.timestamp_ms for t in turns] == [1_700_000_000_000] * 2
+
+
+RID = frozenset({"requestid", "clientrequestid"})
+MODEL = frozenset({"modelid", "model"})
+
+
+@pytest.mark.parametrize("req, expected", [
+    ({"requestId": "r1", "result": {"modelId": "m1"}}, ("r1", "m1")),
+    ({"nested": {"requestId": "deep"}, "RequestID": "top"}, ("top", "")),
+    ({"a": {"modelId": "", "x": {"model": "hidden"}}, "b": [{"model": "m2"}]}, ("", "m2")),
+    ({"requestId": "", "a": {"clientRequestId": "r2"}}, ("", "")),
+    ({"a": [1, {"model": 7}], "requestId": None, "b": {"requestId": "r3"}}, ("r3", "7")),
+])
+def test_find_fields(req, expected):
+    """Direct fields beat nested ones, nested empty values are skipped, a top-level empty value wins."""
+    assert copilot_extractor._find_fields(req, RID, MODEL) == expected
+
+
+def test_session_titles_read_only(tmp_path):
+    """Titles load from a path with URI-special characters, and the database is not writable."""
+    db_path = tmp_path / "ws #1 %20?" / "state.vscdb"
+    db_path.parent.mkdir()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE ItemTable (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "INSERT INTO ItemTable VALUES ('chat.ChatSessionStore.index', ?)",
+            (json.dumps({"entries": {"s1": {"title": "First"}, "s2": {}}}),),
+        )
+    conn.close()
+
+    assert copilot_extractor._load_session_titles(db_path) == {"s1": "First"}
+    assert copilot_extractor._load_session_titles(tmp_path / "missing.vscdb") == {}
+    conn = copilot_extractor.connect_readonly(db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM ItemTable")
+    conn.close()
+
+
+def test_discover_workspaces_order_and_filtering(tmp_path):
+    """Folders come back in directory order; empty, session-less and plain-file entries are skipped."""
+    sessions = {
+        "ws-a": '{"requests": [{"message": {"text": "a"}}]}',
+        "ws-b": '{"requests": []}',
+        "ws-c": '{"requests": [{"message": {"text": "c"}}]}',
+        "ws-d": None,
+    }
+    for name, text in sessions.items():
+        chat_dir = tmp_path / name / "chatSessions"
+        chat_dir.mkdir(parents=True)
+        if text is not None:
+            (chat_dir / "s.json").write_text(text, encoding="utf-8")
+    (tmp_path / "stray.json").write_text("{}", encoding="utf-8")
+    expected = [p.name for p in tmp_path.iterdir() if p.name in ("ws-a", "ws-c")]
+
+    assert [m.workspace_id for m in copilot_extractor.discover_workspaces(tmp_path)] == expected
+
+
+@pytest.mark.parametrize("fence, expected", [
+    ("```python", "x = 1\n"),
+    ("```", "x = 1\n"),
+    ("```typescriptreact", "```typescriptreactx = 1\n"),
+])
+def test_assistant_code_fences(fence, expected):
+    """A fence line (``` plus up to 12 chars) is held back until a code block starts; longer lines are text."""
+    req = {"response": [{"value": fence}, {"value": "x = 1\n"}]}
+
+    text, _, _, _ = copilot_extractor._extract_assistant_response(req)
+
+    assert text == expected
+
+
+@pytest.mark.parametrize("ref, expected", [
+    ({"name": "normalize_shape(shape)", "location": {"uri": {"path": "/src/shapes.py"}}}, "normalize_shape(shape)"),
+    ({"fsPath": "/src/app/main.py", "path": "/ignored.py"}, "main.py"),
+    ({"path": "/src/app/"}, "app"),
+    ({"location": {"uri": {"fsPath": "/src/util.py"}}}, "util.py"),
+    ({"location": {"uri": "file:///src/util.py"}}, ""),
+    ("not a dict", ""),
+])
+def test_extract_filename_from_ref(ref, expected):
+    """Symbol names win; otherwise the last component of fsPath, path or location.uri."""
+    assert copilot_extractor._extract_filename_from_ref(ref) == expected
+
+
+def test_edits_attached_by_request_id(copilot_workspace_with_edits):
+    """Each editing-session edit lands on the assistant turn of its request, none on user turns."""
+    [meta] = copilot_extractor.discover_workspaces(copilot_workspace_with_edits["storage_root"])
+
+    turns = copilot_extractor.extract_workspace(meta)
+
+    assert [(t.role, t.request_id, len(t.code_edits)) for t in turns] == [
+        ("user", "req-edit-001", 0), ("assistant", "req-edit-001", 1),
+        ("user", "req-edit-002", 0), ("assistant", "req-edit-002", 1),
+    ]
+
+
+@pytest.mark.parametrize("req, expected", [
+    ({"result": {"timings": {"totalElapsed": 1234.7}}}, 1234),
+    ({"result": {"timings": {"totalElapsed": "12"}}}, 0),
+    ({"result": {"timings": []}}, 0),
+    ({"result": "error"}, 0),
+    ({"result": {}}, 0),
+    ({}, 0),
+])
+def test_extract_response_time(req, expected):
+    """Only a numeric totalElapsed under dict levels counts."""
+    assert copilot_extractor._extract_response_time(req) == expected
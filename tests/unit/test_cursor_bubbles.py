@@ -0,0 +1,93 @@
+"""Tests for Cursor bubble parsing.
+
+Tests:
+- parse_timestamp accepts epoch ms, numeric strings and ISO strings, rejecting pre-2020 and junk values
+- parse_timestamp_ms rejects values outside 2020..year 9999 without building a datetime
+- Repeated timestamp values are parsed once
+- parse_bubble keeps dict code blocks, resolving the file path and collecting codeblock ids
+- BubbleData instances carry no per-instance dict
+"""
+import pytest
+
+from src.extract_plugins.cursor import bubbles as cursor_bubbles
+
+TS_MS = 1_704_164_645_000
+TS_ISO = "2024-01-02T03:04:05+00:00"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (TS_MS, (TS_MS, TS_ISO)),
+    (float(TS_MS), (TS_MS, TS_ISO)),
+    (f" {TS_MS} ", (TS_MS, TS_ISO)),
+    ("2024-01-02T03:04:05Z", (TS_MS, TS_ISO)),
+    ("2024-01-02T03:04:05.250Z", (TS_MS + 250, "2024-01-02T03:04:05.250000+00:00")),
+    ("2024-01-02T05:04:05+02:00", (TS_MS, TS_ISO)),
+    ("2024-01-02T03:04:05", (TS_MS, TS_ISO)),
+    (1_500_000_000_000, (None, None)),
+    ("not a date", (None, None)),
+    ("", (None, None)),
+    (None, (None, None)),
+    ([TS_MS], (None, None)),
+])
+def test_parse_timestamp(value, expected):
+    """Naive ISO strings are taken as UTC; values before 2020 are rejected."""
+    assert cursor_bubbles.parse_timestamp(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (TS_MS, TS_MS),
+    ("2024-01-02T03:04:05Z", TS_MS),
+    (1_577_836_800_000, 1_577_836_800_000),
+    (1_577_836_799_999, None),
+    (253_402_300_799_999, 253_402_300_799_999),
+    (253_402_300_800_000, None),
+    (1e30, None),
+    (None, None),
+])
+def test_parse_timestamp_ms(value, expected):
+    """Only the millisecond value is returned; out-of-range values give None from both parsers."""
+    assert cursor_bubbles.parse_timestamp_ms(value) == expected
+    if expected is None:
+        assert cursor_bubbles.parse_timestamp(value) == (None, None)
+    else:
+        assert cursor_bubbles.parse_timestamp(value) == (expected, cursor_bubbles.ms_to_iso(expected))
+
+
+def test_parse_timestamp_cached():
+    """The same value seen again is served from the cache."""
+    cursor_bubbles._parse_timestamp_ms_cached.cache_clear()
+
+    for _ in range(3):
+        cursor_bubbles.parse_timestamp("2024-01-02T03:04:05Z")
+
+    info = cursor_bubbles._parse_timestamp_ms_cached.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_parse_bubble_code_blocks():
+    """Non-dict blocks are skipped; blocks without a codeblockId are kept but not listed as ids."""
+    bubble = cursor_bubbles.parse_bubble("b1", {"type": 2, "text": " done ", "codeBlocks": [
+        {"uri": {"path": "/code/a.py"}, "content": "a\n", "languageId": "python", "codeblockId": "cb1"},
+        "not a block",
+        {"uri": "file:///code/b.py", "content": "b\n", "codeBlockIdx": 1},
+        {"uri": {"_fsPath": "/code/c.py"}, "codeblockId": "cb3", "codeBlockIdx": 2},
+    ]})
+
+    assert bubble.text == "done"
+    assert bubble.codeblock_ids == ["cb1", "cb3"]
+    assert [(b["file_path"], b["content"], b["language_id"], b["codeblock_id"], b["codeblock_idx"])
+            for b in bubble.code_blocks] == [
+        ("/code/a.py", "a\n", "python", "cb1", 0),
+        ("", "b\n", "", "", 1),
+        ("/code/c.py", "", "", "cb3", 2),
+    ]
+
+
+def test_bubble_data_slotted():
+    """Declared fields stay assignable; undeclared attributes are rejected."""
+    bubble = cursor_bubbles.BubbleData(bubble_id="b1", type=2)
+    bubble.model_info = "gpt"
+
+    assert not hasattr(bubble, "__dict__")
+    with pytest.raises(AttributeError):
+        bubble.extra = 1
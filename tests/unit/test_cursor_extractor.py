@@ -0,0 +1,352 @@
+"""Tests for the Cursor extractor helpers.
+
+Tests:
+- Storage paths are resolved once per process
+- Schema A sessions fetch their bubbles in batched queries, falling back to header info
+- extract_workspace builds turns from the global database
+- Stored values parse from str and bytes; invalid UTF-8 is dropped, malformed JSON is skipped
+- originalFileStates entries with content supply the before text of code edits
+- Parallel workspace extraction keeps composer order and skips failing sessions
+- Inline diffs are read through a key-index range and filtered by composer
+- discover_workspaces reads the databases read-only and keeps composers with content
+- Table lookups are cached per read-only connection, not for plain connections
+- Composer validation batches its queries and falls back to the workspace database
+- Composer content is decided from byte markers when conclusive, else from parsed JSON
+- Missing timestamps and assistant models are carried forward from earlier bubbles
+- find_workspace opens only the requested workspace's database
+"""
+import json
+import sqlite3
+
+import pytest
+
+from src.extract_plugins.cursor import extractor as cursor_extractor
+from src.extract_plugins.cursor.turns import WorkspaceMeta
+
+CREATED_MS = 1_700_000_000_000
+
+
+def _make_global_db(path, entries):
+    """Write a global state.vscdb whose cursorDiskKV holds entries (values JSON-encoded)."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cursorDiskKV (key TEXT UNIQUE ON CONFLICT REPLACE, value BLOB)")
+    conn.executemany(
+        "INSERT INTO cursorDiskKV (key, value) VALUES (?, ?)",
+        [(key, value if isinstance(value, (str, bytes)) else json.dumps(value)) for key, value in entries.items()],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _schema_a_entries(composer_id, bubbles):
+    """cursorDiskKV entries for a Schema A composer with (bubble_id, type, text) bubbles."""
+    entries = {f"composerData:{composer_id}": {
+        "name": "Session",
+        "createdAt": CREATED_MS,
+        "fullConversationHeadersOnly": [{"bubbleId": bid, "type": btype} for bid, btype, _ in bubbles],
+    }}
+    for i, (bid, btype, text) in enumerate(bubbles):
+        if text is not None:
+            entries[f"bubbleId:{composer_id}:{bid}"] = {"type": btype, "text": text, "createdAt": CREATED_MS + i}
+    return entries
+
+
+def _make_workspace(folder, composer_ids):
+    """Write a workspaceStorage folder listing composer_ids, for the project folder /code/my-project."""
+    folder.mkdir(parents=True)
+    (folder / "workspace.json").write_text(json.dumps({"folder": "file:///code/my-project"}), encoding="utf-8")
+    conn = sqlite3.connect(folder / "state.vscdb")
+    conn.execute("CREATE TABLE ItemTable (key TEXT UNIQUE ON CONFLICT REPLACE, value BLOB)")
+    conn.execute("INSERT INTO ItemTable VALUES ('composer.composerData', ?)", (json.dumps(
+        {"allComposers": [{"composerId": composer_id} for composer_id in composer_ids]}
+    ),))
+    conn.commit()
+    conn.close()
+
+
+def _meta(tmp_path, composer_ids):
+    return WorkspaceMeta(
+        workspace_id="ws", workspace_name="ws", workspace_folder="", path=tmp_path, composer_ids=composer_ids,
+    )
+
+
+def test_storage_paths_resolved_once(monkeypatch, tmp_path):
+    """The platform and home lookups run once; both storage paths share the cached User dir."""
+    calls = []
+    monkeypatch.setattr(cursor_extractor.platform, "system", lambda: calls.append(1) or "Linux")
+    monkeypatch.setattr(cursor_extractor.Path, "home", classmethod(lambda cls: tmp_path))
+    cursor_extractor._get_cursor_user_dir.cache_clear()
+    try:
+        for _ in range(3):
+            workspace_storage = cursor_extractor.get_workspace_storage()
+            global_storage = cursor_extractor.get_global_storage()
+    finally:
+        cursor_extractor._get_cursor_user_dir.cache_clear()
+
+    assert len(calls) == 1
+    assert workspace_storage == tmp_path / ".config/Cursor/User/workspaceStorage"
+    assert global_storage == tmp_path / ".config/Cursor/User/globalStorage"
+
+
+def test_schema_a_bubbles_batched(tmp_path, monkeypatch):
+    """Bubbles are fetched BATCH keys per query; a missing bubble keeps its header type."""
+    monkeypatch.setattr(cursor_extractor, "_KEY_QUERY_BATCH", 2)
+    bubbles = [("b1", 1, "question"), ("b2", 2, "answer"), ("b3", 1, None), ("b4", 2, "more"), ("b5", 1, "again")]
+    db_path = _make_global_db(tmp_path / "global.vscdb", _schema_a_entries("c1", bubbles))
+    queries = []
+    conn = sqlite3.connect(db_path)
+    conn.set_trace_callback(queries.append)
+
+    extracted = cursor_extractor._extract_bubbles_schema_a(
+        conn, "c1", [{"bubbleId": bid, "type": btype} for bid, btype, _ in bubbles]
+    )
+    conn.close()
+
+    assert [(b.bubble_id, b.type, b.text) for b in extracted] == [
+        ("b1", 1, "question"), ("b2", 2, "answer"), ("b3", 1, ""), ("b4", 2, "more"), ("b5", 1, "again"),
+    ]
+    assert len([q for q in queries if "bubbleId:" in q]) == 3
+
+
+def test_extract_workspace_from_global_db(tmp_path):
+    """A Schema A composer in the global database becomes alternating user/assistant turns."""
+    db_path = _make_global_db(tmp_path / "global.vscdb", _schema_a_entries(
+        "c1", [("b1", 1, "question"), ("b2", 2, "answer"), ("b3", 1, "follow-up"), ("b4", 2, "reply")],
+    ))
+
+    turns, session_count = cursor_extractor.extract_workspace(_meta(tmp_path, ["c1", "missing"]), db_path)
+
+    assert session_count == 1
+    assert [(t.role, t.original_text) for t in turns] == [
+        ("user", "question"), ("assistant", "answer"), ("user", "follow-up"), ("assistant", "reply"),
+    ]
+    assert {t.session_name for t in turns} == {"Session"}
+
+
+def test_stored_values_parse(tmp_path):
+    """TEXT and BLOB values parse alike; bad UTF-8 bytes are dropped and a malformed bubble is left out."""
+    db_path = _make_global_db(tmp_path / "global.vscdb", {
+        "composerData:c1": b'{"name": "Caf\xff\xc3\xa9", "conversation": []}',
+        "bubbleId:c1:b1": json.dumps({"text": "as text"}),
+        "bubbleId:c1:b2": json.dumps({"text": "as blob"}).encode("utf-8"),
+        "bubbleId:c1:b3": b'{"text": ',
+    })
+    conn = sqlite3.connect(db_path)
+
+    composer = cursor_extractor._query_composer_data(conn, "c1")
+    bubbles = cursor_extractor._query_bubbles(conn, "c1", ["b1", "b2", "b3"])
+    conn.close()
+
+    assert composer["name"] == "Caf\u00e9"
+    assert bubbles == {"b1": {"text": "as text"}, "b2": {"text": "as blob"}}
+
+
+def test_original_file_states_feed_code_edits(tmp_path):
+    """A Schema B code block with no inline diff takes its before text from originalFileStates."""
+    db_path = _make_global_db(tmp_path / "global.vscdb", {"composerData:c1": {
+        "createdAt": CREATED_MS,
+        "conversation": [
+            {"bubbleId": "b1", "type": 1, "text": "edit it"},
+            {"bubbleId": "b2", "type": 2, "text": "done", "codeBlocks": [
+                {"uri": {"fsPath": "/code/app.py"}, "content": "new\n", "codeblockId": "cb1"},
+            ]},
+        ],
+        "originalFileStates": {
+            "file:///code/app.py": {"content": "old\n"},
+            "file:///code/other.py": "not a dict",
+            "file:///code/empty.py": {"language": "py"},
+        },
+    }})
+
+    turns, _ = cursor_extractor.extract_workspace(_meta(tmp_path, ["c1"]), db_path)
+
+    [edit] = turns[1].code_edits
+    assert (edit.code_before, edit.code_after) == ("old\n", "new\n")
+
+
+def test_extract_workspace_keeps_composer_order(tmp_path, monkeypatch):
+    """Turns from many composers come back in composer order; a session that raises is skipped."""
+    composer_ids = [f"c{i:02d}" for i in range(20)]
+    entries = {}
+    for cid in composer_ids:
+        entries.update(_schema_a_entries(cid, [("q", 1, f"{cid} question"), ("a", 2, f"{cid} answer")]))
+    db_path = _make_global_db(tmp_path / "global.vscdb", entries)
+    real_extract = cursor_extractor.extract_session
+
+    def extract(composer_id, **kwargs):
+        if composer_id == "c07":
+            raise RuntimeError("boom")
+        return real_extract(composer_id, **kwargs)
+
+    monkeypatch.setattr(cursor_extractor, "extract_session", extract)
+
+    turns, session_count = cursor_extractor.extract_workspace(_meta(tmp_path, composer_ids), db_path)
+
+    expected = [cid for cid in composer_ids if cid != "c07"]
+    assert session_count == len(expected)
+    assert [t.original_text for t in turns] == [
+        text for cid in expected for text in (f"{cid} question", f"{cid} answer")
+    ]
+
+
+def test_inline_diffs_key_range(tmp_path):
+    """Only inlineDiffUndoRedo keys for the composer are returned, found with an index search."""
+    def diff(composer_id, codeblock_id):
+        return {
+            "composerMetadata": {"composerId": composer_id, "codeblockId": codeblock_id},
+            "uri": {"fsPath": "/code/app.py"}, "originalTextLines": ["a"], "newTextLines": ["b"],
+        }
+
+    db_path = _make_global_db(tmp_path / "global.vscdb", {
+        "inlineDiffUndoRedo:1": diff("c1", "cb1"),
+        "inlineDiffUndoRedo:2": diff("c2", "cb2"),
+        "inlineDiffUndoRedoZ": diff("c1", "cb3"),
+        "inlineDiffUndoRedp:1": diff("c1", "cb4"),
+        "inlinediffundoredo:1": diff("c1", "cb5"),
+        "inlineDiffUndoRedo:bad": "{",
+    })
+    queries = []
+    conn = sqlite3.connect(db_path)
+    conn.set_trace_callback(queries.append)
+
+    diffs = cursor_extractor._query_inline_diffs(conn, "c1")
+    [plan] = conn.execute(f"EXPLAIN QUERY PLAN {queries[0]}").fetchall()
+    conn.close()
+
+    assert sorted(diffs) == ["cb1", "cb3"]
+    assert diffs["cb1"] == {"before_lines": ["a"], "after_lines": ["b"], "file_path": "/code/app.py"}
+    assert "USING INDEX" in plan[-1]
+
+
+def test_discover_workspaces_read_only(tmp_path, monkeypatch):
+    """Workspaces list their composers with content; every connection is opened read-only and tuned."""
+    storage = tmp_path / "workspaceStorage"
+    _make_workspace(storage / "ws-1", ["c1", "empty", "missing"])
+    entries = _schema_a_entries("c1", [("b1", 1, "question")])
+    entries["composerData:empty"] = {"fullConversationHeadersOnly": [], "conversation": []}
+    db_path = _make_global_db(tmp_path / "global.vscdb", entries)
+    opened = []
+    real_open = cursor_extractor._open_ro
+
+    def open_ro(path):
+        conn = real_open(path)
+        opened.append((conn.execute("PRAGMA query_only").fetchone()[0], conn.execute("PRAGMA cache_size").fetchone()[0]))
+        return conn
+
+    monkeypatch.setattr(cursor_extractor, "_open_ro", open_ro)
+
+    [meta] = cursor_extractor.discover_workspaces(storage, db_path)
+
+    assert (meta.workspace_name, meta.composer_ids) == ("my-project", ["c1"])
+    assert opened == [(1, -65536)] * 2
+    conn = real_open(db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM cursorDiskKV")
+    conn.close()
+
+
+def test_table_exists_cached_per_connection(tmp_path):
+    """Connections from _open_ro query sqlite_master once per table name; plain connections every time."""
+    db_path = _make_global_db(tmp_path / "global.vscdb", {})
+    plain = sqlite3.connect(db_path)
+    read_only = cursor_extractor._open_ro(db_path)
+    counts = {}
+    for name, conn in (("plain", plain), ("read_only", read_only)):
+        queries = []
+        conn.set_trace_callback(queries.append)
+        results = [cursor_extractor._table_exists(conn, table) for table in ("cursorDiskKV", "ItemTable") * 3]
+        counts[name] = len(queries)
+        conn.close()
+        assert results == [True, False] * 3
+
+    assert counts == {"plain": 6, "read_only": 2}
+
+
+def test_composers_with_data_batched(tmp_path, monkeypatch):
+    """One query per batch and database; composers empty in the global database are checked in the workspace one."""
+    monkeypatch.setattr(cursor_extractor, "_KEY_QUERY_BATCH", 2)
+    conversation = {"conversation": [{"bubbleId": "b1", "type": 1}]}
+    global_conn = sqlite3.connect(_make_global_db(tmp_path / "global.vscdb", {
+        "composerData:g1": {"fullConversationHeadersOnly": [{"bubbleId": "b1"}]},
+        "composerData:g2": conversation,
+        "composerData:w1": {"conversation": []},
+        "composerData:bad": "{",
+    }))
+    workspace_conn = sqlite3.connect(_make_global_db(tmp_path / "workspace.vscdb", {
+        "composerData:w1": conversation,
+        "composerData:w2": {"conversation": []},
+    }))
+    queries = []
+    global_conn.set_trace_callback(queries.append)
+    workspace_conn.set_trace_callback(queries.append)
+
+    with_data = cursor_extractor._composers_with_data(
+        ["g1", "g2", "w1", "w2", "bad", "missing"], global_conn, workspace_conn
+    )
+    global_conn.close()
+    workspace_conn.close()
+
+    assert with_data == {"g1", "g2", "w1"}
+    assert len([q for q in queries if "composerData:" in q]) == 3 + 2
+
+
+@pytest.mark.parametrize("value, expected, parsed", [
+    (b'{"fullConversationHeadersOnly":[{"bubbleId":"b1"}]}', True, False),
+    ('{"name":"x","conversation":[{"bubbleId":"b1"}]}', True, False),
+    (b'{"name":"no conversation"}', False, False),
+    (b'{"fullConversationHeadersOnly":[],"conversation":[]}', False, True),
+    (b'{"conversation": [\n  {"bubbleId": "b1"}\n]}', True, True),
+    (b'{"conversation": [', False, True),
+    (42, False, False),
+])
+def test_composer_has_content(value, expected, parsed, monkeypatch):
+    """Compact values with a non-empty list or without either key are decided without parsing."""
+    calls = []
+    real_loads = cursor_extractor._loads_value
+    monkeypatch.setattr(cursor_extractor, "_loads_value", lambda v: calls.append(v) or real_loads(v))
+
+    assert cursor_extractor._composer_has_content(value) is expected
+    assert bool(calls) is parsed
+
+
+def test_propagate_metadata():
+    """Timestamps carry to any later bubble without one; models only between assistant bubbles."""
+    BubbleData = cursor_extractor.BubbleData
+    bubbles = [
+        BubbleData(bubble_id="u1", type=1),
+        BubbleData(bubble_id="a1", type=2, model_info="m1", timestamp_ms=CREATED_MS, timestamp_iso="t1"),
+        BubbleData(bubble_id="u2", type=1),
+        BubbleData(bubble_id="a2", type=2, timestamp_ms=CREATED_MS + 1, timestamp_iso="t2"),
+        BubbleData(bubble_id="a3", type=2, model_info="m3"),
+    ]
+
+    cursor_extractor._propagate_metadata(bubbles)
+
+    assert [(b.timestamp_ms, b.timestamp_iso, b.model_info) for b in bubbles] == [
+        (None, None, None),
+        (CREATED_MS, "t1", "m1"),
+        (CREATED_MS, "t1", None),
+        (CREATED_MS + 1, "t2", "m1"),
+        (CREATED_MS + 1, "t2", "m3"),
+    ]
+
+
+def test_find_workspace_opens_only_its_database(tmp_path, monkeypatch):
+    """Loading one workspace opens the global database and that workspace's, not the other workspaces'."""
+    storage = tmp_path / "workspaceStorage"
+    for name in ("ws-1", "ws-2", "ws-3"):
+        _make_workspace(storage / name, ["c1"])
+    _make_workspace(storage / "ws-empty", ["missing"])
+    db_path = _make_global_db(tmp_path / "global.vscdb", _schema_a_entries("c1", [("b1", 1, "question")]))
+    opened = []
+    real_open = cursor_extractor._open_ro
+    monkeypatch.setattr(cursor_extractor, "_open_ro", lambda path: opened.append(path) or real_open(path))
+
+    meta = cursor_extractor.find_workspace("ws-2", storage, db_path)
+
+    assert (meta.workspace_id, meta.composer_ids) == ("ws-2", ["c1"])
+    assert opened == [db_path, storage / "ws-2" / "state.vscdb"]
+    assert cursor_extractor.find_workspace("ws-empty", storage, db_path) is None
+    assert cursor_extractor.find_workspace("missing", storage, db_path) is None
+    assert cursor_extractor.find_workspace("../workspaceStorage/ws-1", storage, db_path) is None
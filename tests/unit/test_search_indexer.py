@@ -0,0 +1,61 @@
+"""Tests for embedding backfill with a stubbed embedding model.
+
+Tests:
+- Backfill stores one embedding per non-empty turn and skips unchanged turns
+- Completed batches are kept when a later batch fails
+"""
+import numpy as np
+import pytest
+
+from src.shared.database import db_schema
+from src.shared.search import search_indexer
+
+
+def _fake_embed(texts, model_name, batch_size=32):
+    vectors = np.ones((len(texts), 4), dtype=np.float32)
+    return vectors / 2.0
+
+
+@pytest.fixture
+def turns_db(tmp_path):
+    conn = db_schema.init_shared_db(tmp_path / "gennie.db", verbose=False)
+    db_schema.ensure_turn_embeddings_table(conn)
+    conn.executemany(
+        "INSERT INTO turns (session_id, turn, role, text, original_text) VALUES (?, ?, ?, ?, ?)",
+        [("s1", i, "user", f"text {i}", f"text {i}") for i in range(5)] + [("s1", 5, "user", "", "")],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_backfill_embeds_each_turn_once(turns_db, monkeypatch):
+    monkeypatch.setattr(search_indexer, "embed_texts", _fake_embed)
+
+    stats = search_indexer.backfill_turn_embeddings(turns_db, "fake-model", batch_size=2)
+    assert stats == {"total": 5, "updated": 5, "skipped": 0}
+
+    rows = turns_db.execute("SELECT dims, length(embedding) FROM turn_embeddings").fetchall()
+    assert rows == [(4, 16)] * 5
+
+    stats = search_indexer.backfill_turn_embeddings(turns_db, "fake-model", batch_size=2)
+    assert stats == {"total": 5, "updated": 0, "skipped": 5}
+
+
+def test_backfill_keeps_completed_batches_on_failure(turns_db, monkeypatch):
+    calls = []
+
+    def flaky_embed(texts, model_name, batch_size=32):
+        calls.append(len(texts))
+        if len(calls) == 2:
+            raise RuntimeError("model crashed")
+        return _fake_embed(texts, model_name)
+
+    monkeypatch.setattr(search_indexer, "embed_texts", flaky_embed)
+
+    with pytest.raises(RuntimeError):
+        search_indexer.backfill_turn_embeddings(turns_db, "fake-model", batch_size=2)
+    turns_db.rollback()
+
+    count = turns_db.execute("SELECT COUNT(*) FROM turn_embeddings").fetchone()[0]
+    assert count == 2
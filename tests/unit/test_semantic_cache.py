@@ -0,0 +1,119 @@
+"""Tests for the in-process search result cache.
+
+Tests:
+- Exact, similar and dissimilar query lookups
+- TTL expiry and LRU eviction
+- search_turns serves repeated queries from the cache and rescans after DB writes
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.shared.config.models import SearchConfig
+from src.shared.database import db_schema, db_search
+from src.shared.search import semantic_cache
+from src.shared.search.semantic_cache import SemanticCache
+
+
+def _unit(*values):
+    vec = np.asarray(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def test_exact_query_hit_ignores_case_and_spacing():
+    cache = SemanticCache()
+    cache.put("scope", "Pytest  fixtures", {"results": [1]})
+
+    assert cache.get("scope", "pytest fixtures") == {"results": [1]}
+    assert cache.get("other-scope", "pytest fixtures") is None
+
+
+def test_similar_embedding_hit_respects_threshold():
+    cache = SemanticCache(threshold=0.9)
+    cache.put("scope", "how to run tests", {"results": ["a"]}, _unit(1.0, 0.0))
+
+    assert cache.get("scope", "running the tests", _unit(1.0, 0.1)) == {"results": ["a"]}
+    assert cache.get("scope", "deploy to prod", _unit(0.0, 1.0)) is None
+    assert cache.get("other-scope", "running the tests", _unit(1.0, 0.1)) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    cache = SemanticCache(ttl_seconds=10)
+    cache.put("scope", "q", {"results": []}, _unit(1.0, 0.0))
+
+    now[0] += 9
+    assert cache.get("scope", "q") is not None
+    now[0] += 2
+    assert cache.get("scope", "q", _unit(1.0, 0.0)) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_evicted():
+    cache = SemanticCache(max_entries=2)
+    cache.put("scope", "a", {"n": 1})
+    cache.put("scope", "b", {"n": 2})
+    cache.get("scope", "a")
+    cache.put("scope", "c", {"n": 3})
+
+    assert cache.get("scope", "b") is None
+    assert cache.get("scope", "a") == {"n": 1}
+    assert cache.get("scope", "c") == {"n": 3}
+
+
+@pytest.fixture
+def fts_db(tmp_path, monkeypatch):
+    """Database with two turns and an FTS index; search cache enabled."""
+    db_path = tmp_path / "gennie.db"
+    conn = db_schema.init_shared_db(db_path, verbose=False)
+    conn.executemany(
+        "INSERT INTO turns (session_id, turn, role, text, original_text) VALUES (?, ?, ?, ?, ?)",
+        [("s1", 1, "user", "pytest fixtures", "pytest fixtures"),
+         ("s1", 2, "assistant", "use tmp_path", "use tmp_path")],
+    )
+    db_schema.ensure_turns_fts_table(conn)
+    db_schema.rebuild_turns_fts(conn)
+    conn.commit()
+    conn.close()
+
+    config = SimpleNamespace(search=SearchConfig(semantic_cache_enabled=True))
+    monkeypatch.setattr(db_search, "get_config", lambda: config)
+    db_search.clear_search_cache()
+    yield db_path
+    db_search.clear_search_cache()
+
+
+def test_search_turns_serves_repeated_query_from_cache(fts_db, monkeypatch):
+    calls = []
+    real_run = db_search._run_search
+    monkeypatch.setattr(db_search, "_run_search", lambda *a, **k: calls.append(a[1]) or real_run(*a, **k))
+
+    conn = db_schema.connect_db(fts_db)
+    first = db_search.search_turns(conn, "pytest", mode="keyword")
+    second = db_search.search_turns(conn, "PyTest", mode="keyword")
+    conn.close()
+
+    assert calls == ["pytest"]
+    assert second["query"] == "PyTest"
+    assert second["results"] == first["results"]
+    assert first["total_count"] == 1
+
+
+def test_search_turns_cache_invalidated_by_db_write(fts_db, monkeypatch):
+    calls = []
+    real_run = db_search._run_search
+    monkeypatch.setattr(db_search, "_run_search", lambda *a, **k: calls.append(a[1]) or real_run(*a, **k))
+
+    conn = db_schema.connect_db(fts_db)
+    db_search.search_turns(conn, "pytest", mode="keyword")
+    conn.execute(
+        "INSERT INTO turns (session_id, turn, role, text, original_text) VALUES ('s2', 1, 'user', 'more pytest', 'more pytest')"
+    )
+    conn.commit()
+    result = db_search.search_turns(conn, "pytest", mode="keyword")
+    conn.close()
+
+    assert len(calls) == 2
+    assert result["total_count"] == 2
@@ -0,0 +1,130 @@
+"""Tests for batched workspace lookup in workspace_discovery.
+
+Tests:
+- find_workspaces scans each agent once for many IDs
+- Cached and duplicate IDs do not trigger another scan
+- Unknown IDs resolve to None and are cached
+- Folder-based cross-agent consolidation fills _agent_workspace_ids
+"""
+import pytest
+
+from src.pipeline.extraction import workspace_discovery
+from src.shared.models.workspace import WorkspaceInfo
+
+
+def _make_extractor(agent_name, workspaces, scan_calls):
+    class FakeExtractor:
+        @classmethod
+        def create(cls, workspace_id, **kwargs):
+            return cls()
+
+        def scan_workspaces(self):
+            scan_calls[agent_name] = scan_calls.get(agent_name, 0) + 1
+            return list(workspaces)
+
+    return FakeExtractor
+
+
+@pytest.fixture
+def fake_registry(monkeypatch):
+    """Stub the agent registry with two agents sharing one folder."""
+    agents = {
+        "copilot": [
+            WorkspaceInfo(workspace_id="ws-a", workspace_name="alpha", workspace_folder="/code/alpha", session_count=2),
+            WorkspaceInfo(workspace_id="ws-b", workspace_name="beta", workspace_folder="/code/beta", session_count=1),
+        ],
+        "claude_code": [
+            WorkspaceInfo(workspace_id="-code-alpha", workspace_name="alpha", workspace_folder="/code/alpha", session_count=3),
+        ],
+    }
+    scan_calls = {}
+    classes = {name: _make_extractor(name, ws, scan_calls) for name, ws in agents.items()}
+    monkeypatch.setattr(workspace_discovery, "list_registered_agents", lambda: list(classes))
+    monkeypatch.setattr(workspace_discovery, "get_extractor_class", classes.get)
+    workspace_discovery.clear_find_workspace_cache()
+    yield scan_calls
+    workspace_discovery.clear_find_workspace_cache()
+
+
+def test_find_workspaces_scans_each_agent_once(fake_registry):
+    """K IDs resolve with exactly one scan per agent."""
+    found = workspace_discovery.find_workspaces(["ws-a", "ws-b", "missing"])
+
+    assert fake_registry == {"copilot": 1, "claude_code": 1}
+    assert found["ws-a"].workspace_name == "alpha"
+    assert found["ws-b"].workspace_name == "beta"
+
+
+def test_find_workspaces_cached_and_duplicate_ids_do_not_rescan(fake_registry, monkeypatch):
+    """Repeated and already-cached IDs reuse the first scan."""
+    scans = []
+    original = workspace_discovery._scan_agent_workspaces
+    monkeypatch.setattr(
+        workspace_discovery, "_scan_agent_workspaces",
+        lambda: scans.append(1) or original(),
+    )
+
+    found = workspace_discovery.find_workspaces(["ws-a", "ws-a", "ws-b"])
+    assert list(found) == ["ws-a", "ws-b"]
+
+    workspace_discovery.find_workspaces(["ws-b", "ws-a"])
+    workspace_discovery.find_workspace("ws-a")
+
+    assert len(scans) == 1
+    assert fake_registry == {"copilot": 1, "claude_code": 1}
+
+
+def test_find_workspaces_unknown_id_cached_as_none(fake_registry):
+    """Unknown IDs map to None and the miss is cached."""
+    assert workspace_discovery.find_workspaces(["nope"]) == {"nope": None}
+    assert workspace_discovery.find_workspace("nope") is None
+
+    assert fake_registry == {"copilot": 1, "claude_code": 1}
+
+
+def test_find_workspaces_consolidates_agents_by_folder(fake_registry):
+    """Agents pointing at the same folder are merged with their own IDs kept."""
+    ws = workspace_discovery.find_workspaces(["ws-a"])["ws-a"]
+
+    assert sorted(ws.agents) == ["claude_code", "copilot"]
+    assert ws.session_count == 5
+    assert ws._agent_workspace_ids == {"copilot": "ws-a", "claude_code": "-code-alpha"}
+
+
+@pytest.fixture
+def many_workspaces(monkeypatch):
+    """Stub a single agent with five workspaces, two sharing a name."""
+    workspaces = [
+        WorkspaceInfo(workspace_id="id-e", workspace_name="echo", workspace_folder="/e"),
+        WorkspaceInfo(workspace_id="id-b2", workspace_name="Bravo", workspace_folder="/b2"),
+        WorkspaceInfo(workspace_id="id-a", workspace_name="alpha", workspace_folder="/a"),
+        WorkspaceInfo(workspace_id="id-b1", workspace_name="bravo", workspace_folder="/b1"),
+        WorkspaceInfo(workspace_id="id-c", workspace_name="", workspace_folder="/c"),
+    ]
+    extractor = _make_extractor("copilot", workspaces, {})
+    monkeypatch.setattr(workspace_discovery, "list_registered_agents", lambda: ["copilot"])
+    monkeypatch.setattr(workspace_discovery, "get_extractor_class", {"copilot": extractor}.get)
+
+
+def test_list_workspaces_by_page_matches_full_listing(many_workspaces):
+    """Pages concatenate to the sorted listing, ties keeping scan order."""
+    full = [ws.workspace_id for ws in workspace_discovery.list_all_workspaces()]
+    assert full == ["id-a", "id-b2", "id-b1", "id-e", "id-c"]
+
+    pages = []
+    for page in (1, 2, 3):
+        rows, total = workspace_discovery.list_workspaces_by_page(page, 2)
+        assert total == 5
+        pages.extend(ws.workspace_id for ws in rows)
+
+    assert pages == full
+
+
+def test_list_workspaces_by_page_boundaries(many_workspaces):
+    """Last partial page, past-the-end and non-positive pages."""
+    rows, total = workspace_discovery.list_workspaces_by_page(3, 2)
+    assert [ws.workspace_id for ws in rows] == ["id-c"]
+
+    assert workspace_discovery.list_workspaces_by_page(4, 2) == ([], 5)
+    assert workspace_discovery.list_workspaces_by_page(0, 2) == ([], 5)
+    assert workspace_discovery.list_workspaces_by_page(-1, 2) == ([], 5)